@@ -0,0 +1,50 @@
+"""Recall and latency of the LSH match index against exact scoring.
+
+Run from ``backend/`` with the usual environment loaded::
+
+    python -m benchmarks.ann_recall --pets 50000 --queries 200
+"""
+import argparse
+import numpy as np
+from  logic.ann_index import LSHIndex
+from  logic.matching_logic import VectorMatrix
+from  benchmarks.synthetic import random_pets, random_adopters, timed
+
+
+def _recall(exact, approximate) -> float:
+    expected = {pet_id for pet_id, _ in exact}
+    if not expected:
+        return 1.0
+    return len(expected & {pet_id for pet_id, _ in approximate}) / len(expected)
+
+
+def run(pets: int, queries: int, top_k: int, threshold: float):
+    pet_vectors = random_pets(pets)
+    adopters = random_adopters(queries)
+    exact_time, exact = timed(
+        lambda: [pet_vectors.top_k(q, top_k, threshold) for q in adopters.vectors]
+    )
+    print(f"{pets} pets, {queries} queries, top_k={top_k}, threshold={threshold}")
+    print(f"{'exact':<10} recall 1.000  {exact_time / queries * 1e3:8.3f} ms/query")
+
+    for name, index in (("lsh", LSHIndex()),):
+        build_time, _ = timed(index.sync, pet_vectors)
+        indexed = VectorMatrix(pet_vectors.ids, pet_vectors.vectors, pet_vectors.norms, index)
+        query_time, approximate = timed(
+            lambda: [indexed.top_k(q, top_k, threshold) for q in adopters.vectors]
+        )
+        recall = np.mean([_recall(e, a) for e, a in zip(exact, approximate)])
+        print(
+            f"{name:<10} recall {recall:.3f}  {query_time / queries * 1e3:8.3f} ms/query"
+            f"  (build {build_time:.2f} s)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pets", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    args = parser.parse_args()
+    run(args.pets, args.queries, args.top_k, args.threshold)
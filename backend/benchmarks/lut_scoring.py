@@ -0,0 +1,45 @@
+"""Ranking agreement, memory and latency of LUT scoring against float scoring.
+
+Run from ``backend/`` with the usual environment loaded::
+
+    python -m benchmarks.lut_scoring --pets 50000 --queries 200
+"""
+import argparse
+from  logic.quantized import QuantizedMatrix
+from  benchmarks.synthetic import random_pets, random_adopters, timed
+
+
+def run(pets: int, queries: int, top_k: int, threshold: float):
+    pet_vectors = random_pets(pets)
+    adopters = random_adopters(queries)
+    build_time, quantized = timed(QuantizedMatrix.from_matrix, pet_vectors)
+
+    float_time, expected = timed(
+        lambda: [pet_vectors.top_k(q, top_k, threshold) for q in adopters.vectors]
+    )
+    lut_time, actual = timed(
+        lambda: [quantized.top_k(q, top_k, threshold) for q in adopters.vectors]
+    )
+    same = sum([pet_id for pet_id, _ in e] == [pet_id for pet_id, _ in a] for e, a in zip(expected, actual))
+    drift = max(
+        (abs(es - as_) for e, a in zip(expected, actual) for (_, es), (_, as_) in zip(e, a)),
+        default=0.0
+    )
+
+    print(f"{pets} pets, {queries} queries, top_k={top_k}, threshold={threshold}")
+    print(f"{'float':<6} {pet_vectors.vectors.nbytes / 2**20:8.2f} MiB  {float_time / queries * 1e3:8.3f} ms/query")
+    print(
+        f"{'lut':<6} {quantized.codes.nbytes / 2**20:8.2f} MiB  {lut_time / queries * 1e3:8.3f} ms/query"
+        f"  (build {build_time:.2f} s)"
+    )
+    print(f"identical rankings: {same}/{queries}, max score difference {drift:.1e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pets", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    args = parser.parse_args()
+    run(args.pets, args.queries, args.top_k, args.threshold)
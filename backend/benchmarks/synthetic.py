@@ -0,0 +1,85 @@
+"""Random pets and adopters encoded exactly like real rows, for benchmarks."""
+import random
+from types import SimpleNamespace
+import numpy as np
+from  models.pet import PetSpecies, PetAgeGroup, PetSex, PetSize, PetEnergyLevel, ExperienceLevel, HairLength
+from  models import user_preferences as prefs
+from  models.user_training_preferences import TrainingTrait
+from  logic.matching_logic import VectorMatrix, build_pet_matrix, build_adopter_matrix
+
+
+def _maybe(rng, enum_cls):
+    return rng.choice([None, *enum_cls])
+
+
+def _traits(rng):
+    return rng.sample(list(TrainingTrait), rng.randint(0, len(TrainingTrait)))
+
+
+def random_pet_rows(count: int, seed: int = 0):
+    """``Pet``-like rows and their ``TrainingTrait`` values by pet id."""
+    rng = random.Random(seed)
+    pets = [
+        SimpleNamespace(
+            id=pet_id,
+            species=rng.choice(list(PetSpecies)),
+            age_group=rng.choice(list(PetAgeGroup)),
+            sex=rng.choice(list(PetSex)),
+            size=_maybe(rng, PetSize),
+            energy_level=_maybe(rng, PetEnergyLevel),
+            experience_level=_maybe(rng, ExperienceLevel),
+            hair_length=_maybe(rng, HairLength),
+            allergy_friendly=rng.choice([None, True, False]),
+            special_needs=rng.choice([None, True, False]),
+            kid_friendly=rng.choice([None, True, False]),
+            pet_friendly=rng.choice([None, True, False]),
+        )
+        for pet_id in range(1, count + 1)
+    ]
+    return pets, {pet.id: _traits(rng) for pet in pets}
+
+
+def random_pets(count: int, seed: int = 0) -> VectorMatrix:
+    pets, traits_by_pet = random_pet_rows(count, seed)
+    return VectorMatrix([pet.id for pet in pets], build_pet_matrix(pets, traits_by_pet))
+
+
+def random_preference_rows(count: int, seed: int = 1):
+    """``UserPreferences``-like rows and their ``TrainingTrait`` values by user id."""
+    rng = random.Random(seed)
+    rows = [
+        SimpleNamespace(
+            user_id=user_id,
+            preferred_species=rng.choice(list(prefs.PetSpecies)),
+            has_children=rng.random() < 0.5,
+            has_dogs=rng.random() < 0.5,
+            has_cats=rng.random() < 0.5,
+            ownership_experience=rng.choice(list(prefs.OwnershipExperience)),
+            preferred_age=rng.choice(list(prefs.PetAgeGroup)),
+            preferred_sex=rng.choice(list(prefs.PreferredSex)),
+            preferred_size=rng.choice(list(prefs.PreferredSize)),
+            preferred_energy_level=rng.choice(list(prefs.PetEnergyLevel)),
+            preferred_hair_length=rng.choice(list(prefs.HairLength)),
+            wants_allergy_friendly=rng.random() < 0.5,
+            accepts_special_needs=rng.random() < 0.5,
+        )
+        for user_id in range(1, count + 1)
+    ]
+    return rows, {row.user_id: _traits(rng) for row in rows}
+
+
+def random_adopters(count: int, seed: int = 1) -> VectorMatrix:
+    rows, traits_by_user = random_preference_rows(count, seed)
+    return VectorMatrix([row.user_id for row in rows], build_adopter_matrix(rows, traits_by_user))
+
+
+def timed(fn, *args, repeat: int = 1):
+    """Best wall-clock seconds of ``repeat`` runs, and the last result."""
+    import time
+
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
@@ -17,6 +17,12 @@ class Settings(BaseSettings):
 
     BASE_URL: str = "http://localhost:8000"
 
+    MATCH_INDEX: str = "exact"
+    VECTOR_STORAGE: str = "array"
+    MATCH_SCORING: str = "float"
+    PET_SEARCH: str = "postgres"
+    CATALOG_SNAPSHOT_DIR: Optional[str] = None
+
     AWS_S3_ACCESS_KEY_ID: Optional[str] = None
     AWS_S3_SECRET_ACCESS_KEY: Optional[str] = None
     AWS_S3_BUCKET_NAME: Optional[str] = None
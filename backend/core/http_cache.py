@@ -0,0 +1,36 @@
+"""ETag revalidation helpers for cacheable GET routes."""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+PUBLIC_REVALIDATE = "public, no-cache"
+PUBLIC_SHORT = "public, max-age=60, must-revalidate"
+PUBLIC_LONG = "public, max-age=300, must-revalidate"
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over ``parts``, which must identify the response body."""
+    return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest() + '"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes added by proxies still match.
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def check_not_modified(request: Request, response: Response, etag: str, cache_control: str, vary: str = None) -> Optional[Response]:
+    """A 304 when the client already holds ``etag``; otherwise tag ``response`` and return None."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if vary:
+        headers["Vary"] = vary
+    if _matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,112 @@
+import threading
+import time
+import numpy as np
+from  models.adopter_vector import AdopterVector
+from  models.user_preferences import UserPreferences
+from  core.config import settings
+from  logic.catalog_events import on_adopter_vector_saved
+from  logic.matching_logic import VectorMatrix, stack_vectors, top_k_indices
+
+ADOPTER_CACHE_MAX_AGE_SECONDS = 600
+
+
+def _enum_value(value):
+    return getattr(value, "value", value) or ""
+
+
+class AdopterMatrixCache:
+    """Every adopter vector plus the preference columns reverse matching filters on.
+
+    Loaded once from ``adopter_vectors`` and then patched one row at a time
+    whenever this process saves an adopter vector. Saves made by other
+    processes are picked up by a full reload after ``max_age_seconds``.
+    """
+
+    def __init__(self, max_age_seconds: float = ADOPTER_CACHE_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self.matrix = None
+        self.has_children = None
+        self.experience = None
+        self.loaded_at = None
+        self._row_of = {}
+        self._lock = threading.Lock()
+
+    def _load(self, db):
+        results = (
+            db.query(
+                AdopterVector.user_id,
+                AdopterVector.vector,
+                AdopterVector.vector_f32,
+                AdopterVector.norm,
+                UserPreferences.has_children,
+                UserPreferences.ownership_experience
+            )
+            .outerjoin(UserPreferences, UserPreferences.user_id == AdopterVector.user_id)
+            .order_by(AdopterVector.user_id)
+            .all()
+        )
+        stacked = stack_vectors([(r.user_id, r.vector, r.vector_f32, r.norm) for r in results])
+        self.matrix = VectorMatrix(stacked.ids.copy(), np.array(stacked.vectors), np.array(stacked.norms))
+        self.has_children = np.array([bool(r.has_children) for r in results], dtype=bool)
+        self.experience = np.array([_enum_value(r.ownership_experience) for r in results], dtype=object)
+        self._row_of = {int(user_id): row for row, user_id in enumerate(self.matrix.ids)}
+        self.loaded_at = time.monotonic()
+
+    def _ensure_loaded(self, db):
+        if self.loaded_at is None or time.monotonic() - self.loaded_at > self.max_age_seconds:
+            self._load(db)
+
+    def upsert(self, user_id: int, vector, preferences):
+        """Patch one adopter's row in place, appending it if it is new."""
+        dtype = "<f4" if settings.VECTOR_STORAGE == "float32" else np.float64
+        vector = np.asarray(vector, dtype=dtype).astype(np.float64)
+        has_children = bool(getattr(preferences, "has_children", False))
+        experience = _enum_value(getattr(preferences, "ownership_experience", None))
+
+        with self._lock:
+            if self.matrix is None:
+                return
+            row = self._row_of.get(int(user_id))
+            if row is None and len(self.matrix) and self.matrix.dim != vector.shape[0]:
+                self.loaded_at = None
+                return
+
+            if row is None:
+                self._row_of[int(user_id)] = len(self.matrix)
+                vectors = vector[np.newaxis] if len(self.matrix) == 0 else np.vstack([self.matrix.vectors, vector])
+                self.matrix = VectorMatrix(
+                    np.append(self.matrix.ids, int(user_id)),
+                    vectors,
+                    np.append(self.matrix.norms, np.linalg.norm(vector))
+                )
+                self.has_children = np.append(self.has_children, has_children)
+                self.experience = np.append(self.experience, np.array([experience], dtype=object))
+            else:
+                self.matrix.vectors[row] = vector
+                self.matrix.norms[row] = np.linalg.norm(vector)
+                self.has_children[row] = has_children
+                self.experience[row] = experience
+
+    def top_adopters(self, pet_vector, db, top_k: int = 10, similarity_threshold: float = 0.6, has_children=None, experience=None):
+        """Best-scoring adopters for one pet vector as ``[(user_id, score), ...]``."""
+        with self._lock:
+            self._ensure_loaded(db)
+            matrix = self.matrix
+            if has_children is not None or experience is not None:
+                mask = np.ones(len(matrix), dtype=bool)
+                if has_children is not None:
+                    mask &= self.has_children == bool(has_children)
+                if experience is not None:
+                    mask &= self.experience == _enum_value(experience)
+                matrix = matrix.subset(np.flatnonzero(mask))
+
+            scores = matrix.scores(pet_vector)
+            return [(int(matrix.ids[i]), float(scores[i])) for i in top_k_indices(scores, top_k, similarity_threshold)]
+
+
+adopter_matrix_cache = AdopterMatrixCache()
+
+
+@on_adopter_vector_saved
+def _sync_adopter(user_id, vector, preferences):
+    adopter_matrix_cache.upsert(user_id, vector, preferences)
@@ -0,0 +1,135 @@
+import numpy as np
+
+MATCH_INDEX_KINDS = ("exact", "lsh")
+LSH_HASH_CHUNK_SIZE = 4096
+
+
+class LSHIndex:
+    """Random-hyperplane LSH over the rows of one pet matrix.
+
+    Each of ``n_tables`` tables buckets a row by the signs of ``n_bits``
+    random projections, so rows sharing a bucket with the query are likely
+    to have a high cosine score. A table is its rows sorted by bucket key
+    plus the sorted distinct keys and where each bucket starts, so a query
+    is one ``searchsorted`` per table and a boolean mask over the rows.
+
+    Syncing against a new matrix with the index of the previous one only
+    hashes rows whose pet is new or whose vector changed; the other rows
+    keep their buckets and are renumbered, so keeping the index current
+    costs O(changed pets) in hashing.
+    """
+
+    def __init__(self, n_tables: int = 24, n_bits: int = 16, seed: int = 0):
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+        self.planes = None
+        self.tables = []
+        self.size = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = None
+
+    def __len__(self):
+        return self.size
+
+    def _hash(self, vectors: np.ndarray) -> np.ndarray:
+        """Bucket key of every row in every table, shaped (rows, tables)."""
+        vectors = np.atleast_2d(vectors)
+        if self.planes is None:
+            rng = np.random.default_rng(self.seed)
+            self.planes = rng.standard_normal((self.n_tables * self.n_bits, vectors.shape[-1]))
+        weights = 1 << np.arange(self.n_bits, dtype=np.int64)
+        keys = np.empty((len(vectors), self.n_tables), dtype=np.int64)
+        # Chunked so the projections never exist for the whole matrix at once.
+        for start in range(0, len(vectors), LSH_HASH_CHUNK_SIZE):
+            chunk = vectors[start:start + LSH_HASH_CHUNK_SIZE]
+            bits = (chunk @ self.planes.T > 0).reshape(len(chunk), self.n_tables, self.n_bits)
+            keys[start:start + len(chunk)] = (bits * weights).sum(axis=-1)
+        return keys
+
+    @staticmethod
+    def _table(sorted_keys: np.ndarray, order: np.ndarray):
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        return sorted_keys[starts], np.append(starts, len(order)), order
+
+    def _reusable(self, previous, dim: int) -> bool:
+        return (
+            previous is not None and previous.tables and previous.planes is not None
+            and previous.planes.shape == (self.n_tables * self.n_bits, dim)
+        )
+
+    def sync(self, matrix, previous: "LSHIndex" = None) -> int:
+        """Bucket every row of ``matrix``; returns the rows hashed.
+
+        With ``previous``, an index synced against an earlier matrix, rows
+        whose pet id and vector it already had reuse its buckets.
+        """
+        vectors = matrix.vectors
+        self.tables = []
+        self.size = len(matrix)
+        self.ids = np.asarray(matrix.ids, dtype=np.int64)
+        self.vectors = vectors
+        if len(matrix) == 0 or matrix.dim == 0:
+            return 0
+
+        if not self._reusable(previous, matrix.dim):
+            for table_keys in self._hash(vectors).T:
+                order = np.argsort(table_keys, kind="stable")
+                self.tables.append(self._table(table_keys[order], order))
+            return len(matrix)
+
+        self.planes = previous.planes
+        # Row of every pet in the previous matrix, kept only when its vector is unchanged.
+        by_id = np.argsort(previous.ids, kind="stable")
+        positions = np.minimum(np.searchsorted(previous.ids, self.ids, sorter=by_id), len(by_id) - 1)
+        previous_rows = by_id[positions]
+        kept = previous.ids[previous_rows] == self.ids
+        for start in range(0, len(kept), LSH_HASH_CHUNK_SIZE):
+            chunk = slice(start, start + LSH_HASH_CHUNK_SIZE)
+            rows = previous_rows[chunk]
+            kept[chunk] &= (previous.vectors[rows] == vectors[chunk]).all(axis=1)
+
+        new_rows = np.full(previous.size, -1, dtype=np.int64)
+        new_rows[previous_rows[kept]] = np.flatnonzero(kept)
+        changed = np.flatnonzero(~kept)
+        changed_keys = self._hash(vectors[changed])
+
+        for (bucket_keys, bounds, order), added_keys in zip(previous.tables, changed_keys.T):
+            sorted_keys = np.repeat(bucket_keys, np.diff(bounds))
+            rows = new_rows[order]
+            survivors = rows >= 0
+            sorted_keys, rows = sorted_keys[survivors], rows[survivors]
+
+            added = np.argsort(added_keys, kind="stable")
+            at = np.searchsorted(sorted_keys, added_keys[added])
+            self.tables.append(self._table(
+                np.insert(sorted_keys, at, added_keys[added]),
+                np.insert(rows, at, changed[added])
+            ))
+        return len(changed)
+
+    def candidate_rows(self, query, top_k: int) -> np.ndarray:
+        if not self.tables:
+            return np.empty(0, dtype=np.int64)
+        keys = self._hash(np.asarray(query, dtype=np.float64))[0]
+        # Marking a mask is far cheaper than np.unique over overlapping buckets.
+        hit = np.zeros(self.size, dtype=bool)
+        for (bucket_keys, bounds, order), key in zip(self.tables, keys):
+            bucket = np.searchsorted(bucket_keys, key)
+            if bucket < len(bucket_keys) and bucket_keys[bucket] == key:
+                hit[order[bounds[bucket]:bounds[bucket + 1]]] = True
+        return np.flatnonzero(hit)
+
+
+def build_index(kind: str):
+    """Unsynced index for ``settings.MATCH_INDEX``; ``"exact"`` means no index.
+
+    An index answers with row numbers of the matrix it was synced against,
+    so build one per matrix and sync it with the previous matrix's index
+    rather than re-syncing a shared one.
+    """
+    if kind == "exact":
+        return None
+    if kind == "lsh":
+        return LSHIndex()
+    raise ValueError(f"Unknown MATCH_INDEX {kind!r}, expected one of {MATCH_INDEX_KINDS}")
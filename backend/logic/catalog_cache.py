@@ -0,0 +1,234 @@
+"""Read-through cache for pet cards and pet lists shared by every worker.
+
+Entries live in Redis as JSON under ``catalog:<generation>:...``. A catalog
+change in any worker increments the ``catalog:generation`` counter and
+publishes it on ``catalog:invalidate``; every worker listens, adopts the
+new generation (so old keys are simply never read again and expire) and
+bumps its local catalog version so its in-process caches drop too.
+
+When Redis cannot be reached the cache falls back to an in-process LRU
+keyed by the local catalog version, and retries Redis after a back-off.
+Other workers cannot move that version during an outage, so local entries
+expire after the same TTL as the Redis ones.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import redis
+from  core.config import settings
+from  logic.catalog_events import get_catalog_version, bump_catalog_version, on_catalog_change
+
+CATALOG_CACHE_TTL_SECONDS = 300
+CATALOG_CACHE_LOCAL_SIZE = 2048
+REDIS_RETRY_SECONDS = 30
+GENERATION_KEY = "catalog:generation"
+INVALIDATE_CHANNEL = "catalog:invalidate"
+
+_MISSING = object()
+
+
+def _params_key(params) -> str:
+    return hashlib.blake2b(json.dumps(params, sort_keys=True, default=str).encode(), digest_size=12).hexdigest()
+
+
+class CatalogCache:
+    def __init__(self, redis_url: str, ttl_seconds: int = CATALOG_CACHE_TTL_SECONDS, local_size: int = CATALOG_CACHE_LOCAL_SIZE):
+        self.redis = redis.Redis.from_url(redis_url, socket_connect_timeout=0.25, socket_timeout=0.25)
+        self.ttl_seconds = ttl_seconds
+        self.local_size = local_size
+        self.process_id = uuid.uuid4().hex
+        self._generation = None
+        self._pending_invalidation = False
+        self._down_until = 0.0
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._listener = None
+        self._before_invalidate = []
+
+    # -- Redis availability -------------------------------------------------
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _mark_down(self, error: Exception):
+        if self._available():
+            print(f"Catalog cache: Redis unavailable, using in-process cache ({error})")
+        self._down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        self._generation = None
+
+    def _current_generation(self):
+        if self._generation is None:
+            if self._pending_invalidation:
+                # A change made while Redis was down still has to reach everyone.
+                self._publish_invalidation()
+                self._pending_invalidation = False
+            else:
+                self._generation = int(self.redis.get(GENERATION_KEY) or 0)
+            self._ensure_listener()
+        return self._generation
+
+    def _publish_invalidation(self):
+        self._generation = int(self.redis.incr(GENERATION_KEY))
+        self.redis.publish(INVALIDATE_CHANNEL, json.dumps({"origin": self.process_id, "generation": self._generation}))
+
+    def shared_generation(self):
+        """Catalog generation shared by every worker, or None while Redis is unavailable."""
+        if not self._available():
+            return None
+        try:
+            return self._current_generation()
+        except redis.RedisError as e:
+            self._mark_down(e)
+            return None
+
+    def _redis_key(self, name: str, key) -> str:
+        return f"catalog:{self._current_generation()}:{name}:{key}"
+
+    # -- Local fallback -----------------------------------------------------
+
+    def _local_get(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return _MISSING
+            stored_at, value = entry
+            if time.monotonic() - stored_at >= self.ttl_seconds:
+                del self._local[key]
+                return _MISSING
+            self._local.move_to_end(key)
+            return value
+
+    def _local_put(self, key, value):
+        with self._lock:
+            self._local[key] = (time.monotonic(), value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    # -- Reads --------------------------------------------------------------
+
+    def get_or_load(self, name: str, params, loader):
+        """JSON-serializable ``loader()`` result for ``name``/``params``, cached."""
+        key = _params_key(params)
+        if self._available():
+            try:
+                redis_key = self._redis_key(name, key)
+                payload = self.redis.get(redis_key)
+                if payload is not None:
+                    return json.loads(payload)
+                value = loader()
+                self.redis.set(redis_key, json.dumps(value, default=str), ex=self.ttl_seconds)
+                return value
+            except redis.RedisError as e:
+                self._mark_down(e)
+
+        local_key = (get_catalog_version(), name, key)
+        value = self._local_get(local_key)
+        if value is _MISSING:
+            value = loader()
+            self._local_put(local_key, value)
+        return value
+
+    def get_many(self, name: str, ids, loader) -> dict:
+        """Values for ``ids``; ``loader(missing_ids)`` returns a dict for the misses.
+
+        Ids the loader does not return are not cached.
+        """
+        ids = [int(item_id) for item_id in ids]
+        found = {}
+        if self._available():
+            try:
+                keys = [self._redis_key(name, item_id) for item_id in ids]
+                for item_id, payload in zip(ids, self.redis.mget(keys) if keys else []):
+                    if payload is not None:
+                        found[item_id] = json.loads(payload)
+                missing = [item_id for item_id in ids if item_id not in found]
+                if missing:
+                    loaded = loader(missing)
+                    pipeline = self.redis.pipeline(transaction=False)
+                    for item_id, value in loaded.items():
+                        pipeline.set(self._redis_key(name, item_id), json.dumps(value, default=str), ex=self.ttl_seconds)
+                    pipeline.execute()
+                    found.update(loaded)
+                return found
+            except redis.RedisError as e:
+                self._mark_down(e)
+                found = {}
+
+        version = get_catalog_version()
+        for item_id in ids:
+            value = self._local_get((version, name, item_id))
+            if value is not _MISSING:
+                found[item_id] = value
+        missing = [item_id for item_id in ids if item_id not in found]
+        if missing:
+            loaded = loader(missing)
+            for item_id, value in loaded.items():
+                self._local_put((version, name, item_id), value)
+            found.update(loaded)
+        return found
+
+    # -- Invalidation -------------------------------------------------------
+
+    def before_invalidate(self, listener):
+        """Register ``listener(version)`` to run before a local change is announced.
+
+        Other workers reload as soon as they hear about a change, so anything
+        they will read for it, such as a shared catalog snapshot, has to be
+        published from here.
+        """
+        self._before_invalidate.append(listener)
+        return listener
+
+    def invalidate(self, version: int = None):
+        """Start a new generation everywhere; called on every local catalog change."""
+        with self._lock:
+            self._local.clear()
+        for listener in list(self._before_invalidate):
+            listener(version)
+        if not self._available():
+            self._pending_invalidation = True
+            return
+        try:
+            self._publish_invalidation()
+        except redis.RedisError as e:
+            self._pending_invalidation = True
+            self._mark_down(e)
+
+    def _ensure_listener(self):
+        if self._listener is None:
+            self._listener = threading.Thread(target=self._listen, name="catalog-cache-invalidation", daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATE_CHANNEL)
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self._on_message(message["data"])
+            except (redis.RedisError, ValueError) as e:
+                self._mark_down(e)
+                time.sleep(REDIS_RETRY_SECONDS)
+
+    def _on_message(self, data):
+        message = json.loads(data)
+        if message.get("origin") == self.process_id:
+            return
+        with self._lock:
+            self._local.clear()
+        self._generation = int(message["generation"])
+        bump_catalog_version(notify=False)
+
+
+catalog_cache = CatalogCache(settings.REDIS_URL)
+
+
+@on_catalog_change
+def _invalidate_catalog_cache(version):
+    catalog_cache.invalidate(version)
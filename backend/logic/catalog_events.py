@@ -0,0 +1,49 @@
+import threading
+
+_lock = threading.Lock()
+_catalog_version = 0
+
+
+def get_catalog_version() -> int:
+    return _catalog_version
+
+
+_catalog_listeners = []
+
+
+def on_catalog_change(listener):
+    """Register ``listener(version)`` for catalog changes made by this process."""
+    _catalog_listeners.append(listener)
+    return listener
+
+
+def bump_catalog_version(notify: bool = True) -> int:
+    """Invalidate every cached view of the pet catalog.
+
+    Call after committing any change to pets, pet vectors or pet traits.
+    ``notify=False`` is for relaying a change another process already
+    announced, so listeners do not echo it back.
+    """
+    global _catalog_version
+    with _lock:
+        _catalog_version += 1
+        version = _catalog_version
+    if notify:
+        for listener in list(_catalog_listeners):
+            listener(version)
+    return version
+
+
+_adopter_listeners = []
+
+
+def on_adopter_vector_saved(listener):
+    """Register ``listener(user_id, vector, preferences)`` for adopter vector saves."""
+    _adopter_listeners.append(listener)
+    return listener
+
+
+def adopter_vector_saved(user_id: int, vector, preferences):
+    """Tell in-process adopter caches that a new vector was committed."""
+    for listener in list(_adopter_listeners):
+        listener(user_id, vector, preferences)
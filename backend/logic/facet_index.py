@@ -0,0 +1,128 @@
+import threading
+import numpy as np
+from  models.pet import Pet, PetSpecies, PetSize, PetEnergyLevel, PetAgeGroup, HairLength, PetSex, ExperienceLevel, PetStatus
+from  models.pet_training_traits import PetTrainingTrait, TrainingTrait
+from  logic.vector_cache import FLAG_COLUMNS, sync_catalog_version
+
+FACET_COLUMNS = {
+    "species": PetSpecies,
+    "size": PetSize,
+    "energy_level": PetEnergyLevel,
+    "age_group": PetAgeGroup,
+    "hair_length": HairLength,
+    "sex": PetSex,
+    "experience_level": ExperienceLevel,
+    "status": PetStatus,
+}
+
+
+def _value(value):
+    return getattr(value, "value", value)
+
+
+class PetFacetIndex:
+    """Columnar copy of the pet catalog for filtering and facet counts.
+
+    Every enum column is an ``int8`` array of codes (``-1`` for NULL), every
+    boolean flag an ``int8`` array of 1/0/-1 and every training trait a
+    bitmap. Rows are ordered newest first, so matching row numbers are
+    already in listing order. The index reloads whenever the catalog
+    version moves.
+    """
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.codes = {}
+        self.flags = {}
+        self.traits = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def load(self, db):
+        pets = (
+            db.query(Pet.id, *[getattr(Pet, name) for name in FACET_COLUMNS], *[getattr(Pet, name) for name in FLAG_COLUMNS])
+            .order_by(Pet.created_at.desc(), Pet.id.desc())
+            .all()
+        )
+        self.ids = np.array([pet.id for pet in pets], dtype=np.int64)
+        row_of = {pet_id: row for row, pet_id in enumerate(self.ids.tolist())}
+
+        self.codes = {}
+        for name, enum_type in FACET_COLUMNS.items():
+            code_of = {member.value: code for code, member in enumerate(enum_type)}
+            self.codes[name] = np.array(
+                [code_of.get(_value(getattr(pet, name)), -1) for pet in pets], dtype=np.int8
+            )
+        self.flags = {
+            name: np.array([-1 if getattr(pet, name) is None else int(getattr(pet, name)) for pet in pets], dtype=np.int8)
+            for name in FLAG_COLUMNS
+        }
+
+        self.traits = {trait.value: np.zeros(len(self.ids), dtype=bool) for trait in TrainingTrait}
+        for pet_id, trait in db.query(PetTrainingTrait.pet_id, PetTrainingTrait.trait):
+            row = row_of.get(pet_id)
+            if row is not None:
+                self.traits[_value(trait)][row] = True
+
+    def _sync(self, db):
+        version = sync_catalog_version(db)
+        if version != self._version:
+            self.load(db)
+            self._version = version
+
+    def _masks(self, filters: dict, flags: dict):
+        """One boolean mask per constrained column; values within a column are OR'd."""
+        masks = {}
+        for name, wanted in filters.items():
+            if wanted:
+                code_of = {member.value: code for code, member in enumerate(FACET_COLUMNS[name])}
+                masks[name] = np.isin(self.codes[name], [code_of[_value(value)] for value in wanted])
+        for name, wanted in flags.items():
+            if wanted is not None:
+                masks[name] = self.flags[name] == int(wanted)
+        return masks
+
+    def _combine(self, masks: dict, skip: str = None) -> np.ndarray:
+        mask = np.ones(len(self.ids), dtype=bool)
+        for name, column_mask in masks.items():
+            if name != skip:
+                mask &= column_mask
+        return mask
+
+    def search(self, db, filters: dict = None, flags: dict = None, traits=(), offset: int = 0, limit: int = 20) -> dict:
+        """Matching pet ids for a page plus facet counts.
+
+        ``filters`` maps facet columns to accepted values, ``flags`` maps
+        ``FLAG_COLUMNS`` to True/False and every trait in ``traits`` is
+        required. A column's counts ignore that column's own filter, so they
+        show what selecting another value would return.
+        """
+        with self._lock:
+            self._sync(db)
+            masks = self._masks(filters or {}, flags or {})
+            trait_mask = np.ones(len(self.ids), dtype=bool)
+            for trait in traits:
+                trait_mask &= self.traits[_value(trait)]
+
+            matched = self._combine(masks) & trait_mask
+            rows = np.flatnonzero(matched)
+
+            facets = {}
+            for name, enum_type in FACET_COLUMNS.items():
+                counts = np.bincount(self.codes[name][self._combine(masks, skip=name) & trait_mask] + 1, minlength=len(enum_type) + 1)
+                facets[name] = {member.value: int(counts[code + 1]) for code, member in enumerate(enum_type)}
+            for name in FLAG_COLUMNS:
+                values = self.flags[name][self._combine(masks, skip=name) & trait_mask]
+                facets[name] = {"true": int(np.count_nonzero(values == 1)), "false": int(np.count_nonzero(values == 0))}
+            facets["training_traits"] = {
+                trait: int(np.count_nonzero(bitmap & matched)) for trait, bitmap in self.traits.items()
+            }
+
+            return {
+                "total": int(len(rows)),
+                "pet_ids": self.ids[rows[offset:offset + limit]].tolist(),
+                "facets": facets,
+            }
+
+
+pet_facet_index = PetFacetIndex()
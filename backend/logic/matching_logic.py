@@ -1,4 +1,3 @@
-import pandas as pd
 import numpy as np
 from  models.user_training_preferences import TrainingTrait
 from  schemas.pet_schema import PetAgeGroup, PetSize, PetEnergyLevel, ExperienceLevel, HairLength, PetResponse
@@ -6,119 +5,194 @@ from  schemas.preferences_schema import PreferencesSchema
 from  schemas.training_schema import TraitInput
 from  models.pet_vector import PetVector
 from  models.adopter_vector import AdopterVector
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.sql import func
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 from  models.match import Match
 from  models.pet import Pet
+from  models.user_preferences import UserPreferences
+from  logic.catalog_events import bump_catalog_version, adopter_vector_saved
+from  logic.top_matches import refresh_top_matches, users_matched_to_pet, TOP_MATCHES_PER_ADOPTER
+from  models.adopter_top_match import AdopterTopMatch
+from  core.config import settings
+from  logic.vector_store import (
+    ENCODER_VERSION,
+    VECTOR_STORAGE_MODES,
+    vector_columns,
+    decode_vector,
+    pet_vector_store,
+    adopter_vector_store
+)
 from sqlalchemy.exc import SQLAlchemyError
 from typing import List, Tuple
 
+def _ordinal_codes(enum_cls):
+    last = len(enum_cls) - 1
+    return {e.name: i / last for i, e in enumerate(enum_cls)}, -1 / last
+
+
+_SIZE_CODES = _ordinal_codes(PetSize)
+_ENERGY_LEVEL_CODES = _ordinal_codes(PetEnergyLevel)
+_AGE_GROUP_CODES = _ordinal_codes(PetAgeGroup)
+_EXPERIENCE_LEVEL_CODES = _ordinal_codes(ExperienceLevel)
+_HAIR_LENGTH_CODES = _ordinal_codes(HairLength)
+
+_PET_SEX_CODES = {"Female": 0.0, "Male": 1.0}
+_PREFERRED_SEX_CODES = {"Female": 0.0, "Male": 1.0, "NoPreference": 0.5}
+_SPECIES_CODES = {"Cat": 0.0, "Dog": 1.0}
+_OWNERSHIP_EXPERIENCE_LEVELS = {
+    "FirstTime": "Beginner",
+    "HadBefore": "Intermediate",
+    "CurrentlyHave": "Advanced"
+}
+_TRAIT_NAMES = [e.name for e in TrainingTrait]
+
+VECTOR_DIM = 11 + len(_TRAIT_NAMES)
+
+MATCH_REFRESH_CHUNK_SIZE = 500
+# How many matches every pipeline that writes ``matches`` keeps per adopter:
+# the nightly refresh, rebuild_matches, the per-pet and per-adopter refreshes
+# and the /match/recommendations save. It is also as many as /match/me shows.
+MATCHES_PER_ADOPTER = TOP_MATCHES_PER_ADOPTER
+RECOMMENDATION_TOP_K = MATCHES_PER_ADOPTER
+
+
+def _enum_name(value, default):
+    if value is None:
+        return default
+    return getattr(value, "name", value)
+
+
+def _flag(value) -> float:
+    return float(value) if value is not None else 0.0
+
+
+def _ordinal(codes, name) -> float:
+    table, unknown = codes
+    return table.get(name, unknown)
+
+
+def _preference(codes, name) -> float:
+    if name == "NoPreference":
+        return 0.5
+    return _ordinal(codes, name)
+
+
+def _trait_flags(trait_names) -> List[float]:
+    return [1.0 if trait in trait_names else 0.0 for trait in _TRAIT_NAMES]
+
+
+def _pet_row(pet_info, trait_names) -> List[float]:
+    return [
+        _flag(pet_info.allergy_friendly),
+        _flag(pet_info.special_needs),
+        _flag(pet_info.kid_friendly),
+        _flag(pet_info.pet_friendly),
+        _PET_SEX_CODES.get(_enum_name(pet_info.sex, "NoPreference"), 0.5),
+        _SPECIES_CODES.get(_enum_name(pet_info.species, "Dog"), 0.5),
+        _ordinal(_SIZE_CODES, _enum_name(pet_info.size, "NoPreference")),
+        _ordinal(_ENERGY_LEVEL_CODES, _enum_name(pet_info.energy_level, "NoPreference")),
+        _ordinal(_AGE_GROUP_CODES, _enum_name(pet_info.age_group, "NoPreference")),
+        _ordinal(_EXPERIENCE_LEVEL_CODES, _enum_name(pet_info.experience_level, "Beginner")),
+        _ordinal(_HAIR_LENGTH_CODES, _enum_name(pet_info.hair_length, "NoPreference")),
+    ] + _trait_flags(trait_names)
+
+
+def _adopter_row(preferences, trait_names) -> List[float]:
+    # Column order differs from _pet_row (experience comes first); it is kept
+    # as-is so stored vectors stay comparable with previously encoded ones.
+    experience = _OWNERSHIP_EXPERIENCE_LEVELS.get(_enum_name(preferences.ownership_experience, None), "Beginner")
+    return [
+        _flag(preferences.wants_allergy_friendly),
+        _flag(preferences.accepts_special_needs),
+        _flag(preferences.has_children),
+        _flag(preferences.has_dogs or preferences.has_cats),
+        _ordinal(_EXPERIENCE_LEVEL_CODES, experience),
+        _PREFERRED_SEX_CODES.get(_enum_name(preferences.preferred_sex, None), 0.5),
+        _SPECIES_CODES.get(_enum_name(preferences.preferred_species, None), 0.5),
+        _preference(_SIZE_CODES, _enum_name(preferences.preferred_size, None)),
+        _preference(_ENERGY_LEVEL_CODES, _enum_name(preferences.preferred_energy_level, None)),
+        _preference(_AGE_GROUP_CODES, _enum_name(preferences.preferred_age, None)),
+        _preference(_HAIR_LENGTH_CODES, _enum_name(preferences.preferred_hair_length, None)),
+    ] + _trait_flags(trait_names)
+
+
 def build_pet_vector(pet_info: PetResponse, training_traits: list[TrainingTrait]):
-    df = pd.DataFrame([{
-        "age_group": pet_info.age_group.name if pet_info.age_group is not None else "NoPreference",
-        "size": pet_info.size.name if pet_info.size is not None else "NoPreference",
-        "energy_level": pet_info.energy_level.name if pet_info.energy_level is not None else "NoPreference",
-        "experience_level": pet_info.experience_level.name if pet_info.experience_level is not None else "Beginner",
-        "hair_length": pet_info.hair_length.name if pet_info.hair_length is not None else "NoPreference",
-        "sex": pet_info.sex.name if pet_info.sex is not None else "NoPreference",
-        "species": pet_info.species.name if pet_info.species is not None else "Dog",
-        "allergy_friendly": float(pet_info.allergy_friendly) if pet_info.allergy_friendly is not None else 0.0,
-        "special_needs": float(pet_info.special_needs) if pet_info.special_needs is not None else 0.0,
-        "kid_friendly": float(pet_info.kid_friendly) if pet_info.kid_friendly is not None else 0.0,
-        "pet_friendly": float(pet_info.pet_friendly) if pet_info.pet_friendly is not None else 0.0
-    }])
-
-    df["sex_encoded"] = df["sex"].map(lambda x: 0 if x == "Female" else 1 if x == "Male" else 0.5).astype(float)
-    df["species_encoded"] = df["species"].map(lambda x: 0 if x == "Cat" else 1 if x == "Dog" else 0.5).astype(float)
-    df["size_encoded"] = pd.Categorical(df["size"], categories=[e.name for e in PetSize], ordered=True).codes / (len(PetSize) - 1)
-    df["energy_level_encoded"] = pd.Categorical(df["energy_level"], categories=[e.name for e in PetEnergyLevel], ordered=True).codes / (len(PetEnergyLevel) - 1)
-    df["age_group_encoded"] = pd.Categorical(df["age_group"], categories=[e.name for e in PetAgeGroup], ordered=True).codes / (len(PetAgeGroup) - 1)
-    df["experience_level_encoded"] = pd.Categorical(df["experience_level"], categories=[e.name for e in ExperienceLevel], ordered=True).codes / (len(ExperienceLevel) - 1)
-    df["hair_length_encoded"] = pd.Categorical(df["hair_length"], categories=[e.name for e in HairLength], ordered=True).codes / (len(HairLength) - 1)
-
-    df.drop(columns=[
-        "size", "energy_level", "age_group", "experience_level",
-        "hair_length", "sex", "species"
-    ], inplace=True)
-
-    all_traits = [e.name for e in TrainingTrait]
-    pet_trait_names = {t.name for t in training_traits}
-    trait_vector = [1.0 if trait in pet_trait_names else 0.0 for trait in all_traits]
-
-    return np.concatenate([df.to_numpy().flatten(), np.array(trait_vector)])
+    trait_names = {_enum_name(t, None) for t in training_traits}
+    return np.array(_pet_row(pet_info, trait_names), dtype=np.float64)
 
 
 def build_adopter_vector(preferences: PreferencesSchema, training_traits: list[TraitInput]):
-    def encode_enum(value, enum_cls):
-        if value == "NoPreference":
-            return 0.5
-        codes = pd.Categorical([value], categories=[e.name for e in enum_cls], ordered=True).codes
-        return codes[0] / (len(enum_cls) - 1)
-
-    df = pd.DataFrame([{
-        "age_group": preferences.preferred_age.name,
-        "size": preferences.preferred_size.name,
-        "energy_level": preferences.preferred_energy_level.name,
-        "experience_level": preferences.ownership_experience.name,
-        "hair_length": preferences.preferred_hair_length.name,
-        "sex": preferences.preferred_sex.name,
-        "species": preferences.preferred_species.name,
-        "allergy_friendly": float(preferences.wants_allergy_friendly),
-        "special_needs": float(preferences.accepts_special_needs),
-        "kid_friendly": float(preferences.has_children),
-        "pet_friendly": float(preferences.has_dogs or preferences.has_cats)
-    }])
-
-    experience_mapping = {
-        "FirstTime": "Beginner",
-        "HadBefore": "Intermediate", 
-        "CurrentlyHave": "Advanced"
-    }
-
-    mapped_experience = experience_mapping.get(preferences.ownership_experience.name, "Beginner")
-    df["experience_level"] = mapped_experience
-
-    df["experience_level_encoded"] = pd.Categorical(df["experience_level"], categories=[e.name for e in ExperienceLevel], ordered=True).codes / (len(ExperienceLevel) - 1)
-    df["sex_encoded"] = {"Female": 0.0, "Male": 1.0, "NoPreference": 0.5}.get(df["sex"].iloc[0], 0.5)
-    df["species_encoded"] = {"Cat": 0.0, "Dog": 1.0}.get(df["species"].iloc[0], 0.5)
-
-    df["size_encoded"] = encode_enum(df["size"].iloc[0], PetSize)
-    df["energy_level_encoded"] = encode_enum(df["energy_level"].iloc[0], PetEnergyLevel)
-    df["age_group_encoded"] = encode_enum(df["age_group"].iloc[0], PetAgeGroup)
-    df["hair_length_encoded"] = encode_enum(df["hair_length"].iloc[0], HairLength)
-
-    df.drop(columns=[
-        "size", "energy_level", "age_group", "experience_level",
-        "hair_length", "sex", "species"
-    ], inplace=True)
-
-    all_traits = [e.name for e in TrainingTrait]
-    selected_traits = {t.trait.name for t in training_traits}
-    trait_vector = [1.0 if trait in selected_traits else 0.0 for trait in all_traits]
-
-    return np.concatenate([df.to_numpy().flatten(), np.array(trait_vector)])
-
-
-def save_pet_vector(pet, training_traits, db):
-    vector = build_pet_vector(pet, training_traits)
-    db_vector = PetVector(
-        pet_id=pet.id,
-        vector=vector.tolist(),  
-        updated_at=func.now()
+    trait_names = {t.trait.name for t in training_traits}
+    return np.array(_adopter_row(preferences, trait_names), dtype=np.float64)
+
+
+def build_pet_matrix(pets, traits_by_pet: dict) -> np.ndarray:
+    """Encode many pets in one pass, one row per pet in input order.
+
+    ``pets`` can be ``Pet`` rows or ``PetResponse`` objects; ``traits_by_pet``
+    maps a pet id to its ``TrainingTrait`` values.
+    """
+    rows = [
+        _pet_row(pet, {_enum_name(t, None) for t in traits_by_pet.get(pet.id, ())})
+        for pet in pets
+    ]
+    return np.array(rows, dtype=np.float64).reshape(len(rows), VECTOR_DIM)
+
+
+def build_adopter_matrix(preferences_rows, traits_by_user: dict) -> np.ndarray:
+    """Encode many ``UserPreferences`` rows in one pass, keyed by ``user_id``."""
+    rows = [
+        _adopter_row(prefs, {_enum_name(t, None) for t in traits_by_user.get(prefs.user_id, ())})
+        for prefs in preferences_rows
+    ]
+    return np.array(rows, dtype=np.float64).reshape(len(rows), VECTOR_DIM)
+
+
+def hard_constraints(preferences) -> dict:
+    """Pet flag filters an adopter's answers rule out, for ``adopter_candidates``.
+
+    Wanting an allergy-friendly pet requires one, and explicitly declining
+    special needs excludes them; every other answer is left to scoring.
+    """
+    flags = {}
+    if getattr(preferences, "wants_allergy_friendly", None):
+        flags["allergy_friendly"] = True
+    if getattr(preferences, "accepts_special_needs", None) is False:
+        flags["special_needs"] = False
+    return flags
+
+
+def candidate_key(preferences) -> tuple:
+    """``(species, flags)`` that decide which pets an adopter is scored against."""
+    species = _enum_name(getattr(preferences, "preferred_species", None), None)
+    return species, tuple(sorted(hard_constraints(preferences).items()))
+
+
+def load_candidate_keys(db, user_ids=None) -> dict:
+    """``candidate_key`` of every adopter with preferences, or of ``user_ids``."""
+    query = db.query(
+        UserPreferences.user_id,
+        UserPreferences.preferred_species,
+        UserPreferences.wants_allergy_friendly,
+        UserPreferences.accepts_special_needs
     )
-    db.merge(db_vector)
-    db.commit()
+    if user_ids is not None:
+        query = query.filter(UserPreferences.user_id.in_([int(user_id) for user_id in user_ids]))
+    return {row.user_id: candidate_key(row) for row in query}
+
+
+def save_pet_vector(pet, training_traits, db, store=None):
+    vector = build_pet_vector(pet, training_traits)
+    (store or pet_vector_store(db)).put(pet.id, vector)
+    bump_catalog_version()
 
 
-def save_adopter_vector(user_id, preferences, training_traits, db):
+def save_adopter_vector(user_id, preferences, training_traits, db, store=None):
     vector = build_adopter_vector(preferences, training_traits)
-    db_vector = AdopterVector(
-        user_id=user_id,
-        vector=vector.tolist(), 
-        updated_at=func.now()
-    )
-    db.merge(db_vector)
-    db.commit()
+    (store or adopter_vector_store(db)).put(user_id, vector)
+    adopter_vector_saved(user_id, vector, preferences)
 
 def cosine_similarity(vec1: np.ndarray, vec2: np.ndarray):
     if vec1.size == 0 or vec2.size == 0:
@@ -134,74 +208,389 @@ def cosine_similarity(vec1: np.ndarray, vec2: np.ndarray):
     return float(np.dot(vec1, vec2) / (norm1 * norm2))
 
 
-def get_top_pet_matches(adopter_vector: List[float], pet_vectors: List[Tuple[int, List[float]]], top_k: int = 5, similarity_threshold: float = 0.6):
-    adopter_vec = np.array(adopter_vector)
-    similarities = []
+class VectorMatrix:
+    """Row-stacked vectors with precomputed L2 norms for batch cosine scoring."""
+
+    def __init__(self, ids, vectors, norms=None, index=None, index_rows=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float64)
+        self.norms = np.linalg.norm(self.vectors, axis=1) if norms is None else np.asarray(norms, dtype=np.float64)
+        self.index = index
+        # Row of the indexed matrix behind each row; None when this is that matrix.
+        self.index_rows = index_rows
+        self._local_rows = None
+
+    @classmethod
+    def from_pairs(cls, pairs: List[Tuple[int, List[float]]]):
+        if not pairs:
+            return cls([], np.empty((0, 0)))
+        ids = [item_id for item_id, _ in pairs]
+        return cls(ids, np.array([vector for _, vector in pairs], dtype=np.float64))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def subset(self, rows) -> "VectorMatrix":
+        return VectorMatrix(self.ids[rows], self.vectors[rows], self.norms[rows], self.index, self._subset_index_rows(rows))
+
+    def _subset_index_rows(self, rows):
+        if self.index is None:
+            return None
+        if isinstance(rows, slice):
+            rows = np.arange(*rows.indices(len(self)))
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        return rows if self.index_rows is None else self.index_rows[rows]
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1]
+
+    def freeze(self):
+        """Make the shared arrays read-only."""
+        self.vectors.flags.writeable = False
+        self.norms.flags.writeable = False
+
+    def scores(self, query) -> np.ndarray:
+        query = np.asarray(query, dtype=np.float64)
+        if len(self) == 0:
+            return np.empty(0)
+        if query.size == 0 or self.dim == 0:
+            return np.zeros(len(self))
+        if query.shape != (self.dim,):
+            raise ValueError(f"Vector shape mismatch: {query.shape} vs {(self.dim,)}")
+
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return np.zeros(len(self))
+
+        return _cosine(self.vectors @ query, self.norms * query_norm)
+
+    def score_matrix(self, queries: "VectorMatrix") -> np.ndarray:
+        """Cosine scores of every query row against every row, shaped (queries, rows)."""
+        if len(self) == 0 or len(queries) == 0 or self.dim == 0 or queries.dim == 0:
+            return np.zeros((len(queries), len(self)))
+        if queries.dim != self.dim:
+            raise ValueError(f"Vector shape mismatch: {(queries.dim,)} vs {(self.dim,)}")
+
+        return _cosine(queries.vectors @ self.vectors.T, np.outer(queries.norms, self.norms))
+
+    def top_k(self, query, top_k: int = 5, similarity_threshold: float = 0.6) -> List[Tuple[int, float]]:
+        matrix = self
+        rows = self._index_rows(query, top_k)
+        if rows is not None:
+            matrix = self.subset(rows)
+
+        scores = matrix.scores(query)
+        return [(int(matrix.ids[i]), float(scores[i])) for i in top_k_indices(scores, top_k, similarity_threshold)]
+
+    def _index_rows(self, query, top_k: int):
+        """Rows the ANN index proposes, or None to fall back to an exact scan."""
+        if self.index is None or len(self) <= top_k:
+            return None
+
+        rows = self.index.candidate_rows(query, top_k)
+        if self.index_rows is not None:
+            if self._local_rows is None:
+                local_rows = np.full(len(self.index), -1, dtype=np.int64)
+                local_rows[self.index_rows] = np.arange(len(self))
+                self._local_rows = local_rows
+            rows = self._local_rows[rows]
+            rows = rows[rows >= 0]
+        if len(rows) < top_k:
+            return None
+        return np.sort(rows)
+
+
+def _cosine(dots: np.ndarray, denominators: np.ndarray) -> np.ndarray:
+    scores = np.zeros(dots.shape)
+    np.divide(dots, denominators, out=scores, where=denominators != 0)
+    # BLAS blocks rows differently, so identical pets can differ in the last
+    # bit; rounding keeps them tied so ordering falls back to row order.
+    return np.round(scores, 12)
+
+
+def top_k_indices(scores: np.ndarray, top_k: int, similarity_threshold: float) -> np.ndarray:
+    """Indices of the best ``top_k`` scores at or above the threshold.
+
+    Ties keep their original row order, matching a stable descending sort.
+    """
+    candidates = np.flatnonzero(scores >= similarity_threshold)
+    if top_k <= 0 or candidates.size == 0:
+        return candidates[:0]
+
+    candidate_scores = scores[candidates]
+    if candidates.size > top_k:
+        kth_score = -np.partition(-candidate_scores, top_k - 1)[top_k - 1]
+        above = candidate_scores > kth_score
+        ties = np.flatnonzero(candidate_scores == kth_score)[:top_k - int(above.sum())]
+        keep = np.sort(np.concatenate([np.flatnonzero(above), ties]))
+        candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+
+    order = np.argsort(-candidate_scores, kind="stable")
+    return candidates[order]
+
+
+def get_top_pet_matches(adopter_vector: List[float], pet_vectors, top_k: int = 5, similarity_threshold: float = 0.6):
+    if not isinstance(pet_vectors, VectorMatrix):
+        pet_vectors = VectorMatrix.from_pairs(pet_vectors)
+    return pet_vectors.top_k(adopter_vector, top_k, similarity_threshold)
+
+
+def replace_matches(matches_by_user: Dict[int, List[Tuple[int, float]]], db):
+    """Make ``matches`` hold exactly the given rows for every listed user.
+
+    Stale rows are removed by a data-modifying CTE inside the same upsert, so
+    each user's rows are swapped in one statement. Their materialized top
+    matches are rebuilt in the same transaction. The caller commits.
+    """
+    if not matches_by_user:
+        return
+
+    rows = [
+        {"user_id": int(user_id), "pet_id": int(pet_id), "match_score": float(score)}
+        for user_id, matches in matches_by_user.items()
+        for pet_id, score in matches
+    ]
+    stale = delete(Match).where(Match.user_id.in_([int(user_id) for user_id in matches_by_user]))
+    if rows:
+        stale = stale.where(
+            tuple_(Match.user_id, Match.pet_id).notin_([(row["user_id"], row["pet_id"]) for row in rows])
+        )
+    _upsert_matches(rows, stale, db)
+    refresh_top_matches(matches_by_user, db)
+
+
+def _upsert_matches(rows, stale, db):
+    if not rows:
+        db.execute(stale)
+        return
+
+    upsert = pg_insert(Match).values(rows)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[Match.user_id, Match.pet_id],
+        set_={"match_score": upsert.excluded.match_score}
+    ).add_cte(stale.returning(Match.id).cte("stale_matches"))
+    db.execute(upsert)
+
+
+def _trim_matches(user_ids, top_k: int, db):
+    """Cut each of ``user_ids`` back to their ``top_k`` best matches. The caller commits."""
+    ranked = (
+        select(
+            Match.id,
+            func.row_number().over(
+                partition_by=Match.user_id,
+                order_by=(Match.match_score.desc(), Match.pet_id.desc())
+            ).label("rank")
+        )
+        .where(Match.user_id.in_(user_ids))
+        .subquery()
+    )
+    db.execute(
+        delete(Match)
+        .where(Match.id.in_(select(ranked.c.id).where(ranked.c.rank > top_k)))
+        .execution_options(synchronize_session=False)
+    )
 
-    for pet_id, pet_vec in pet_vectors:
-        pet_vec_np = np.array(pet_vec)
-        score = cosine_similarity(adopter_vec, pet_vec_np)
-        
-        if score >= similarity_threshold:
-            similarities.append((pet_id, score))
 
-    similarities.sort(key=lambda x: x[1], reverse=True)
+def save_matches_for_user(user_id: int, matches: List[Tuple[int, float]], db):
+    try:
+        replace_matches({user_id: matches}, db)
+        db.commit()
+
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise
 
-    return similarities[:top_k]
 
+def stack_vectors(rows) -> VectorMatrix:
+    """Build a VectorMatrix from ``(id, vector, vector_f32, norm)`` rows.
+
+    When every row is stored as float32 the payloads are joined and decoded
+    with a single ``np.frombuffer``, reusing the stored norms.
+    """
+    if rows and all(row[2] is not None for row in rows):
+        vectors = np.frombuffer(b"".join(row[2] for row in rows), dtype="<f4").reshape(len(rows), -1)
+        norms = [row[3] for row in rows]
+        return VectorMatrix(
+            [row[0] for row in rows],
+            vectors,
+            norms if all(norm is not None for norm in norms) else None
+        )
+    return VectorMatrix.from_pairs([(row[0], decode_vector(row[1], row[2])) for row in rows])
+
+
+def load_adopter_vector_record(user_id: int, db):
+    """The user's stored vector and its ``updated_at``, or ``(None, None)``."""
+    record = (
+        db.query(AdopterVector.vector, AdopterVector.vector_f32, AdopterVector.updated_at)
+        .filter(AdopterVector.user_id == user_id)
+        .first()
+    )
+    if record is None:
+        return None, None
+    return decode_vector(record.vector, record.vector_f32).tolist(), record.updated_at
 
-def save_matches_for_user(user_id: int, matches: List[Tuple[int, float]], db):
-    try:
-        existing_matches = {
-            match.pet_id: match 
-            for match in db.query(Match).filter(Match.user_id == user_id).all()
+
+def load_adopter_vector(user_id: int, db, store=None):
+    vector = (store or adopter_vector_store(db)).get(user_id)
+    return vector.tolist() if vector is not None else None
+
+
+def load_adopter_matrix(db) -> VectorMatrix:
+    return stack_vectors(
+        db.query(AdopterVector.user_id, AdopterVector.vector, AdopterVector.vector_f32, AdopterVector.norm).all()
+    )
+
+
+def iter_top_matches(adopters: VectorMatrix, pets: VectorMatrix, top_k: int = MATCHES_PER_ADOPTER, similarity_threshold: float = 0.6, chunk_size: int = MATCH_REFRESH_CHUNK_SIZE):
+    """Score adopters against pets one chunk at a time.
+
+    Yields ``{user_id: [(pet_id, score), ...]}`` per chunk so the
+    adopters x pets score matrix never has to exist in full.
+    """
+    for start in range(0, len(adopters), chunk_size):
+        chunk = adopters.subset(slice(start, start + chunk_size))
+        scores = pets.score_matrix(chunk)
+        yield {
+            int(user_id): [
+                (int(pets.ids[i]), float(row[i]))
+                for i in top_k_indices(row, top_k, similarity_threshold)
+            ]
+            for user_id, row in zip(chunk.ids, scores)
         }
-        
-        for pet_id, score in matches:
-            if pet_id in existing_matches:
-                existing_matches[pet_id].match_score = score
-            else:
-                new_match = Match(
-                    user_id=user_id,
-                    pet_id=pet_id,
-                    match_score=score
-                )
-                db.add(new_match)
-        
-        current_pet_ids = {pet_id for pet_id, _ in matches}
-        for pet_id, match in existing_matches.items():
-            if pet_id not in current_pet_ids:
-                db.delete(match)
-        
+
+
+def iter_candidate_matches(adopters: VectorMatrix, catalog, candidate_keys: dict, top_k: int = MATCHES_PER_ADOPTER, similarity_threshold: float = 0.6, chunk_size: int = MATCH_REFRESH_CHUNK_SIZE):
+    """``iter_top_matches`` with every adopter scored against only their candidates.
+
+    Adopters are grouped by the ``candidate_key`` in ``candidate_keys``, and
+    each group is scored against ``catalog.adopter_candidates`` for that key,
+    the same pets ``/match/recommendations`` ranks. Adopters without
+    preferences are scored against every available pet.
+    """
+    rows_by_key = {}
+    for row, user_id in enumerate(adopters.ids.tolist()):
+        rows_by_key.setdefault(candidate_keys.get(user_id, (None, ())), []).append(row)
+
+    for (species, flags), rows in rows_by_key.items():
+        pets = catalog.adopter_candidates(species, **dict(flags))
+        yield from iter_top_matches(adopters.subset(np.array(rows)), pets, top_k, similarity_threshold, chunk_size)
+
+
+def refresh_all_matches(db, catalog, chunk_size: int = MATCH_REFRESH_CHUNK_SIZE):
+    """Rescore every adopter against their candidates in ``catalog``, a pet catalog snapshot."""
+    adopter_vectors = load_adopter_matrix(db)
+    candidate_keys = load_candidate_keys(db)
+
+    try:
+        for matches_by_user in iter_candidate_matches(adopter_vectors, catalog, candidate_keys, MATCHES_PER_ADOPTER, chunk_size=chunk_size):
+            replace_matches(matches_by_user, db)
+            db.commit()
+
+        delete_orphaned_matches(db)
         db.commit()
 
     except SQLAlchemyError as e:
         db.rollback()
         raise
 
-def load_adopter_vector(user_id: int, db):
-    record = db.query(AdopterVector).filter_by(user_id=user_id).first()
-    return record.vector if record else None
 
-
-def load_pet_vectors(db):
-    results = (
-        db.query(PetVector.pet_id, PetVector.vector)
+def delete_orphaned_matches(db):
+    """Drop matches of users who no longer have an adopter vector. The caller commits."""
+    db.query(Match).filter(
+        Match.user_id.notin_(select(AdopterVector.user_id))
+    ).delete(synchronize_session=False)
+    db.query(AdopterTopMatch).filter(
+        AdopterTopMatch.user_id.notin_(select(AdopterVector.user_id))
+    ).delete(synchronize_session=False)
+
+
+def refresh_matches_for_pet(pet_id: int, db, catalog, top_k: int = MATCHES_PER_ADOPTER, similarity_threshold: float = 0.6):
+    """Re-score one pet against every adopter and rewrite only that pet's matches.
+
+    Only adopters whose candidates in ``catalog`` (a pet catalog snapshot
+    that already includes the change) contain the pet can match it. It joins
+    an adopter's matches when it clears the threshold and either
+    the adopter has fewer than ``top_k`` other matches or it beats their
+    weakest one, which it then evicts. Pets that are no longer available
+    lose all their rows.
+    Every adopter who gained or lost the pet gets their top matches rebuilt,
+    which also refreshes the pet's card after an edit.
+    """
+    record = (
+        db.query(PetVector.vector, PetVector.vector_f32)
         .join(Pet, Pet.id == PetVector.pet_id)
-        .filter(Pet.status == "Available")
-        .all()
+        .filter(PetVector.pet_id == pet_id, Pet.status == "Available")
+        .first()
     )
-    return [(r.pet_id, r.vector) for r in results]
+    stale = delete(Match).where(Match.pet_id == pet_id)
 
-def refresh_all_matches(db):
-    pet_vectors = load_pet_vectors(db)
-    adopter_vectors = db.query(AdopterVector).all()
+    try:
+        rows = []
+        if record is not None:
+            adopters = load_adopter_matrix(db)
+            scores = adopters.scores(decode_vector(record.vector, record.vector_f32))
+            other_matches = {
+                r.user_id: (r.match_count, r.worst_score)
+                for r in db.query(
+                    Match.user_id,
+                    func.count(Match.id).label("match_count"),
+                    func.min(Match.match_score).label("worst_score")
+                ).filter(Match.pet_id != pet_id).group_by(Match.user_id)
+            }
+            candidate_keys = load_candidate_keys(db)
+            is_candidate = {}
+
+            for i in np.flatnonzero(scores >= similarity_threshold):
+                user_id, score = int(adopters.ids[i]), float(scores[i])
+                key = candidate_keys.get(user_id, (None, ()))
+                if key not in is_candidate:
+                    species, flags = key
+                    is_candidate[key] = bool(np.any(catalog.adopter_candidates(species, **dict(flags)).ids == pet_id))
+                if not is_candidate[key]:
+                    continue
+                match_count, worst_score = other_matches.get(user_id, (0, None))
+                if match_count < top_k or score >= worst_score:
+                    rows.append({"user_id": user_id, "pet_id": pet_id, "match_score": score})
+
+        affected_users = set(users_matched_to_pet(pet_id, db))
+        if rows:
+            stale = stale.where(Match.user_id.notin_([row["user_id"] for row in rows]))
+            affected_users.update(row["user_id"] for row in rows)
+        _upsert_matches(rows, stale, db)
+        displacing = [row["user_id"] for row in rows if other_matches.get(row["user_id"], (0, None))[0] >= top_k]
+        if displacing:
+            _trim_matches(displacing, top_k, db)
+        refresh_top_matches(affected_users, db)
+        db.commit()
 
-    db.query(Match).delete()
-    db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise
+
+
+def refresh_matches_for_adopter(user_id: int, preferences, training_traits, pet_vectors: VectorMatrix, db, top_k: int = MATCHES_PER_ADOPTER, similarity_threshold: float = 0.6):
+    """Re-encode one adopter and swap in their new matches in one transaction.
+
+    ``training_traits`` only needs a ``trait`` attribute per item, so
+    ``UserTrainingPreference`` rows can be passed directly.
+    """
+    vector = build_adopter_vector(preferences, training_traits)
+    try:
+        db.merge(AdopterVector(
+            user_id=user_id,
+            updated_at=func.now(),
+            **vector_columns(vector)
+        ))
+        replace_matches({user_id: pet_vectors.top_k(vector, top_k, similarity_threshold)}, db)
+        db.commit()
+
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise
 
-    for adopter_vec in adopter_vectors:
-        user_id = adopter_vec.user_id
-        vector = adopter_vec.vector
-        top_matches = get_top_pet_matches(vector, pet_vectors)
-        save_matches_for_user(user_id, top_matches, db)
+    adopter_vector_store(db).record_changes([user_id])
+    adopter_vector_saved(user_id, vector, preferences)
@@ -0,0 +1,71 @@
+"""Convert stored ARRAY(Float) vectors to compact float32 bytea in batches.
+
+Run from ``backend/`` after applying ``migrations/001_compact_vector_storage.sql``::
+
+    python -m logic.migrate_vectors --batch-size 1000 [--drop-arrays]
+
+Rows are walked in primary-key order and each batch is committed on its
+own, so the script can be stopped and re-run safely. ``--drop-arrays`` also
+revisits rows converted by an earlier run and clears their array column.
+"""
+import argparse
+import numpy as np
+from sqlalchemy import update
+from  core.database import SessionLocal
+from  models.pet_vector import PetVector
+from  models.adopter_vector import AdopterVector
+from  logic.matching_logic import ENCODER_VERSION
+from  logic.vector_store import PostgresVectorStore
+
+
+def convert_table(db, model, key_column, batch_size: int = 1000, drop_arrays: bool = False) -> int:
+    store = PostgresVectorStore(db, model, key_column)
+    converted = 0
+    last_key = None
+    while True:
+        query = db.query(key_column, model.vector).filter(model.vector.isnot(None))
+        if not drop_arrays:
+            query = query.filter(model.vector_f32.is_(None))
+        if last_key is not None:
+            query = query.filter(key_column > last_key)
+        rows = query.order_by(key_column).limit(batch_size).all()
+        if not rows:
+            return converted
+
+        updates = []
+        for key, vector in rows:
+            packed = np.asarray(vector, dtype="<f4")
+            values = {
+                key_column.key: key,
+                "vector_f32": packed.tobytes(),
+                "norm": float(np.linalg.norm(packed.astype(np.float64))),
+                "encoder_version": ENCODER_VERSION
+            }
+            if drop_arrays:
+                values["vector"] = None
+            updates.append(values)
+
+        db.execute(update(model), updates)
+        db.commit()
+        store.record_changes([key for key, _ in rows])
+        converted += len(rows)
+        last_key = rows[-1][0]
+        print(f"{model.__tablename__}: {converted} rows converted")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert stored vectors to float32 bytea.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--drop-arrays", action="store_true", help="Clear the ARRAY(Float) column once converted")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        convert_table(db, PetVector, PetVector.pet_id, args.batch_size, args.drop_arrays)
+        convert_table(db, AdopterVector, AdopterVector.user_id, args.batch_size, args.drop_arrays)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from  models.pet import Pet
+from  models.pet_training_traits import PetTrainingTrait
+from  logic.catalog_cache import catalog_cache
+
+
+def _enum_value(value):
+    return value.value if value is not None else None
+
+
+def pet_card(pet: Pet, training_traits=None) -> dict:
+    """JSON-ready projection of a pet as shown on match and catalog cards."""
+    return {
+        "id": pet.id,
+        "name": pet.name,
+        "species": _enum_value(pet.species),
+        "breed": pet.breed,
+        "age_group": _enum_value(pet.age_group),
+        "sex": _enum_value(pet.sex),
+        "size": _enum_value(pet.size),
+        "energy_level": _enum_value(pet.energy_level),
+        "experience_level": _enum_value(pet.experience_level),
+        "hair_length": _enum_value(pet.hair_length),
+        "allergy_friendly": pet.allergy_friendly,
+        "special_needs": pet.special_needs,
+        "kid_friendly": pet.kid_friendly,
+        "pet_friendly": pet.pet_friendly,
+        "shelter_notes": pet.shelter_notes,
+        "summary": pet.summary,
+        "image_url": str(pet.image_url) if pet.image_url else None,
+        "status": _enum_value(pet.status),
+        "training_traits": list(training_traits or []),
+    }
+
+
+def _query_pet_cards(pet_ids, db) -> dict:
+    query = (
+        db.query(Pet, PetTrainingTrait.trait)
+        .outerjoin(PetTrainingTrait, PetTrainingTrait.pet_id == Pet.id)
+        .filter(Pet.id.in_(pet_ids))
+    )
+
+    cards = {}
+    for pet, trait in query.all():
+        card = cards.get(pet.id)
+        if card is None:
+            card = cards[pet.id] = pet_card(pet)
+        if trait is not None:
+            card["training_traits"].append(trait.name)
+    return cards
+
+
+def load_pet_cards(pet_ids, db, available_only: bool = True, cached: bool = True) -> dict:
+    """Cards for ``pet_ids`` keyed by pet id, fetched with one joined query.
+
+    Cards go through the shared catalog cache unless ``cached`` is False;
+    pass that from code that runs before the catalog version is bumped.
+    """
+    if not pet_ids:
+        return {}
+
+    if cached:
+        cards = catalog_cache.get_many("pet_card", pet_ids, lambda missing: _query_pet_cards(missing, db))
+    else:
+        cards = _query_pet_cards(pet_ids, db)
+    if available_only:
+        cards = {pet_id: card for pet_id, card in cards.items() if card["status"] == "Available"}
+    return cards
@@ -0,0 +1,279 @@
+"""Ranked full-text search over pet name, breed, shelter notes and summary.
+
+``PostgresPetSearch`` queries the generated ``pets.search_vector`` column
+through its GIN index. ``InMemoryPetSearch`` answers the same calls from an
+inverted index held in this process, for environments without Postgres; it
+understands the plain-words and ``-word`` parts of ``websearch_to_tsquery``.
+Both return the same shape and highlight matches with ``<mark>`` tags in
+otherwise HTML-escaped text.
+"""
+import html
+import math
+import re
+import threading
+from sqlalchemy import func, select
+from  models.pet import Pet
+from  core.config import settings
+from  logic.vector_cache import sync_catalog_version
+
+PET_SEARCH_BACKENDS = ("postgres", "memory")
+
+# Field -> (tsvector weight label, ts_rank's default weight for that label).
+SEARCH_FIELDS = {
+    "name": ("A", 1.0),
+    "breed": ("B", 0.4),
+    "shelter_notes": ("C", 0.2),
+    "summary": ("D", 0.1),
+}
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+HEADLINE_WORDS = 25
+# ts_headline marks matches with control characters; the text is escaped
+# before they are swapped for the real tags.
+HEADLINE_START_SENTINEL = "\x02"
+HEADLINE_STOP_SENTINEL = "\x03"
+HEADLINE_OPTIONS = (
+    f'StartSel="{HEADLINE_START_SENTINEL}", StopSel="{HEADLINE_STOP_SENTINEL}", '
+    f"MaxWords={HEADLINE_WORDS}, MinWords=10"
+)
+
+
+def _status_value(status):
+    return getattr(status, "value", status)
+
+
+def _marked_headline(text):
+    """HTML-escaped ``ts_headline`` output with its sentinels turned into tags."""
+    if not text or HEADLINE_START_SENTINEL not in text:
+        return None
+    return (
+        html.escape(text)
+        .replace(HEADLINE_START_SENTINEL, HIGHLIGHT_START)
+        .replace(HEADLINE_STOP_SENTINEL, HIGHLIGHT_STOP)
+    )
+
+
+def _result(pet_id, rank, headlines) -> dict:
+    return {
+        "pet_id": pet_id,
+        "rank": round(float(rank), 4),
+        "highlights": {
+            field: text for field, text in headlines.items()
+            if text and HIGHLIGHT_START in text
+        }
+    }
+
+
+class PostgresPetSearch:
+    """Search through ``pets.search_vector``; Postgres keeps it current itself."""
+
+    def index_pet(self, pet):
+        pass
+
+    def remove_pet(self, pet_id: int):
+        pass
+
+    def search(self, query: str, db, status=None, offset: int = 0, limit: int = 20) -> dict:
+        tsquery = func.websearch_to_tsquery("english", query)
+        rank = func.ts_rank(Pet.search_vector, tsquery, 1)
+        conditions = [Pet.search_vector.op("@@")(tsquery)]
+        if status:
+            conditions.append(Pet.status == _status_value(status))
+        matches = select(Pet.id, rank.label("rank"), func.count().over().label("total")).where(*conditions)
+        # Headlines are costly, so only the page's rows get them.
+        page = matches.order_by(rank.desc(), Pet.id.desc()).offset(offset).limit(limit).subquery()
+
+        rows = db.execute(
+            select(
+                page.c.id,
+                page.c.rank,
+                page.c.total,
+                *[
+                    func.ts_headline("english", getattr(Pet, field), tsquery, HEADLINE_OPTIONS).label(field)
+                    for field in SEARCH_FIELDS
+                ]
+            )
+            .join(Pet, Pet.id == page.c.id)
+            .order_by(page.c.rank.desc(), page.c.id.desc())
+        ).all()
+        if rows:
+            total = rows[0].total
+        else:
+            # A page past the end has no row to carry the window count.
+            total = db.scalar(select(func.count()).select_from(Pet).where(*conditions)) if offset else 0
+        return {
+            "total": total,
+            "results": [
+                _result(row.id, row.rank, {field: _marked_headline(getattr(row, field)) for field in SEARCH_FIELDS})
+                for row in rows
+            ]
+        }
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have he her his in is it its of on or she so that the "
+    "their them they this to was were will with".split()
+)
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _terms(text: str):
+    """``(term, start, end)`` for every indexable word of ``text``."""
+    for match in _WORD.finditer((text or "").lower()):
+        word = match.group()
+        if word not in STOP_WORDS:
+            yield _stem(word), match.start(), match.end()
+
+
+def _parse_query(query: str):
+    """Required and excluded terms; quotes and ``or`` are read as plain words."""
+    required, excluded = set(), set()
+    for token in query.replace('"', " ").split():
+        target = excluded if token.startswith("-") and len(token) > 1 else required
+        target.update(term for term, _, _ in _terms(token))
+    return required, excluded - required
+
+
+def _headline(text: str, terms: set) -> str:
+    """Up to ``HEADLINE_WORDS`` words around the first match, HTML-escaped
+    with matches marked."""
+    words = list(re.finditer(r"\S+", text or ""))
+    hits = [
+        index for index, word in enumerate(words)
+        if any(term in terms for term, _, _ in _terms(word.group()))
+    ]
+    if not hits:
+        return None
+
+    first = max(0, min(hits[0] - HEADLINE_WORDS // 3, len(words) - HEADLINE_WORDS))
+    window = words[first:first + HEADLINE_WORDS]
+    pieces = []
+    for word in window:
+        text_piece, marked, position = word.group(), [], 0
+        for term, start, end in _terms(text_piece):
+            if term in terms:
+                marked += [html.escape(text_piece[position:start]), HIGHLIGHT_START, html.escape(text_piece[start:end]), HIGHLIGHT_STOP]
+                position = end
+        marked.append(html.escape(text_piece[position:]))
+        pieces.append("".join(marked))
+    return " ".join(pieces)
+
+
+class InMemoryPetSearch:
+    """Inverted index of every pet, patched by ``index_pet``/``remove_pet``.
+
+    Each worker holds its own copy and reloads it whenever the catalog
+    version moves, so edits made by other workers show up too.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.documents = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _index(self, pet):
+        self._remove(pet.id)
+        fields = {field: getattr(pet, field) for field in SEARCH_FIELDS}
+        weights = {}
+        for field, text in fields.items():
+            for term, _, _ in _terms(text):
+                weights[term] = weights.get(term, 0.0) + SEARCH_FIELDS[field][1]
+        for term, weight in weights.items():
+            self.postings.setdefault(term, {})[pet.id] = weight
+        self.documents[pet.id] = {
+            "status": _status_value(pet.status),
+            "fields": fields,
+            "terms": set(weights),
+            "length": sum(1 for text in fields.values() for _ in _terms(text))
+        }
+
+    def _remove(self, pet_id: int):
+        document = self.documents.pop(pet_id, None)
+        if document is None:
+            return
+        for term in document["terms"]:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(pet_id, None)
+                if not postings:
+                    del self.postings[term]
+
+    def load(self, db):
+        self.postings, self.documents = {}, {}
+        for pet in db.query(Pet).yield_per(500):
+            self._index(pet)
+
+    def _sync(self, db):
+        version = sync_catalog_version(db)
+        if version != self._version:
+            self.load(db)
+            self._version = version
+
+    def index_pet(self, pet):
+        with self._lock:
+            if self._version is not None:
+                self._index(pet)
+
+    def remove_pet(self, pet_id: int):
+        with self._lock:
+            self._remove(pet_id)
+
+    def search(self, query: str, db, status=None, offset: int = 0, limit: int = 20) -> dict:
+        required, excluded = _parse_query(query)
+        if not required:
+            return {"total": 0, "results": []}
+
+        with self._lock:
+            self._sync(db)
+            candidates = None
+            for term in sorted(required, key=lambda term: len(self.postings.get(term, ()))):
+                pet_ids = self.postings.get(term, {}).keys()
+                candidates = set(pet_ids) if candidates is None else candidates & pet_ids
+                if not candidates:
+                    return {"total": 0, "results": []}
+            for term in excluded:
+                candidates -= self.postings.get(term, {}).keys()
+            if status:
+                candidates = {pet_id for pet_id in candidates if self.documents[pet_id]["status"] == _status_value(status)}
+
+            # Like ts_rank with normalization 1: weighted frequency over log length.
+            ranked = sorted(
+                (
+                    (sum(self.postings[term][pet_id] for term in required)
+                     / (1 + math.log(1 + self.documents[pet_id]["length"])), pet_id)
+                    for pet_id in candidates
+                ),
+                reverse=True
+            )
+            page = ranked[offset:offset + limit]
+            return {
+                "total": len(ranked),
+                "results": [
+                    _result(pet_id, rank, {
+                        field: _headline(text, required)
+                        for field, text in self.documents[pet_id]["fields"].items()
+                    })
+                    for rank, pet_id in page
+                ]
+            }
+
+
+def build_pet_search(kind: str):
+    """Search backend for ``settings.PET_SEARCH``."""
+    if kind == "postgres":
+        return PostgresPetSearch()
+    if kind == "memory":
+        return InMemoryPetSearch()
+    raise ValueError(f"Unknown PET_SEARCH {kind!r}, expected one of {PET_SEARCH_BACKENDS}")
+
+
+pet_search = build_pet_search(settings.PET_SEARCH)
@@ -0,0 +1,128 @@
+import numpy as np
+from  logic.matching_logic import VectorMatrix, _cosine
+
+MATCH_SCORING_MODES = ("float", "lut")
+LUT_TABLE_SIZE = 1 << 12
+
+
+def _group_dimensions(level_counts, table_size: int = LUT_TABLE_SIZE):
+    """Split consecutive dimensions into groups whose joint code fits ``table_size``."""
+    groups, current, product = [], [], 1
+    for j, count in enumerate(level_counts):
+        if current and product * count > table_size:
+            groups.append(current)
+            current, product = [], 1
+        current.append(j)
+        product *= count
+    if current:
+        groups.append(current)
+    return groups
+
+
+class QuantizedMatrix(VectorMatrix):
+    """Pet vectors dictionary-encoded as a few uint16 codes per pet.
+
+    Every encoded dimension is a small ordinal or flag, so each column is
+    replaced by an index into its sorted distinct values (``levels``), and
+    consecutive columns are packed into one joint code per group while the
+    product of their level counts fits ``LUT_TABLE_SIZE``. A query is scored
+    by building each group's lookup table of partial dot products and
+    summing the entries the codes select; tables stay small enough that
+    building them costs less than the gathers. Scores go through the same
+    ``_cosine`` rounding as the float path, so rankings match it except
+    where a score lands halfway at the 12th digit and the two sums round
+    it opposite ways.
+    """
+
+    def __init__(self, ids, codes, levels, groups, norms, index=None, index_rows=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.codes = np.ascontiguousarray(codes, dtype=np.uint16).reshape(len(groups), len(self.ids))
+        self.levels = levels
+        self.groups = groups
+        self.norms = np.asarray(norms, dtype=np.float64)
+        self.index = index
+        self.index_rows = index_rows
+        self._local_rows = None
+
+    @classmethod
+    def from_matrix(cls, matrix: VectorMatrix) -> "QuantizedMatrix":
+        levels, dim_codes = [], []
+        for j in range(matrix.dim):
+            column_levels, inverse = np.unique(matrix.vectors[:, j], return_inverse=True)
+            if len(column_levels) > LUT_TABLE_SIZE:
+                raise ValueError(f"Dimension {j} has {len(column_levels)} distinct values, more than a lookup table holds")
+            levels.append(column_levels)
+            dim_codes.append(inverse.reshape(-1))
+
+        groups = _group_dimensions([len(column_levels) for column_levels in levels])
+        codes = [
+            np.ravel_multi_index([dim_codes[j] for j in group], [len(levels[j]) for j in group])
+            for group in groups
+        ]
+        return cls(matrix.ids, codes, levels, groups, matrix.norms, matrix.index, matrix.index_rows)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Decoded float64 vectors; built on every access."""
+        vectors = np.empty((len(self), self.dim))
+        for group, codes in zip(self.groups, self.codes):
+            dim_codes = np.unravel_index(codes, [len(self.levels[j]) for j in group])
+            for j, column_codes in zip(group, dim_codes):
+                vectors[:, j] = self.levels[j][column_codes]
+        return vectors
+
+    @property
+    def dim(self):
+        return len(self.levels)
+
+    def freeze(self):
+        self.codes.flags.writeable = False
+        self.norms.flags.writeable = False
+
+    def subset(self, rows) -> "QuantizedMatrix":
+        return QuantizedMatrix(
+            self.ids[rows], self.codes[:, rows], self.levels, self.groups, self.norms[rows],
+            self.index, self._subset_index_rows(rows)
+        )
+
+    def _dots(self, query: np.ndarray) -> np.ndarray:
+        dots = np.zeros(len(self))
+        partial = np.empty(len(self))
+        for group, codes in zip(self.groups, self.codes):
+            if not query[group].any():
+                continue
+            table = np.zeros(1)
+            for j in group:
+                table = np.add.outer(table, self.levels[j] * query[j]).ravel()
+            np.take(table, codes, out=partial)
+            dots += partial
+        return dots
+
+    def scores(self, query) -> np.ndarray:
+        query = np.asarray(query, dtype=np.float64)
+        if len(self) == 0:
+            return np.empty(0)
+        if query.size == 0 or self.dim == 0:
+            return np.zeros(len(self))
+        if query.shape != (self.dim,):
+            raise ValueError(f"Vector shape mismatch: {query.shape} vs {(self.dim,)}")
+
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return np.zeros(len(self))
+
+        return _cosine(self._dots(query), self.norms * query_norm)
+
+    def score_matrix(self, queries: VectorMatrix) -> np.ndarray:
+        if len(self) == 0 or len(queries) == 0 or self.dim == 0 or queries.dim == 0:
+            return np.zeros((len(queries), len(self)))
+        return np.vstack([self.scores(query) for query in queries.vectors])
+
+
+def quantize_if_enabled(matrix: VectorMatrix, mode: str) -> VectorMatrix:
+    """``matrix`` in the configured ``MATCH_SCORING`` representation."""
+    if mode == "float":
+        return matrix
+    if mode == "lut":
+        return QuantizedMatrix.from_matrix(matrix)
+    raise ValueError(f"Unknown MATCH_SCORING {mode!r}, expected one of {MATCH_SCORING_MODES}")
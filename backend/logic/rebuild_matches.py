@@ -0,0 +1,119 @@
+"""Rebuild every adopter's matches across a pool of worker processes.
+
+Run from ``backend/`` with the usual environment loaded::
+
+    python -m logic.rebuild_matches --workers 4 --shard-size 2000
+
+The pet catalog arrays are loaded once and handed to each worker when it
+starts. Adopters are split into contiguous ``user_id`` shards; every worker
+loads its shard, scores each adopter against their candidate pets in the
+catalog and commits the upserts itself, so nothing but row counts travels
+back to the parent.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from  core.database import SessionLocal, engine
+from  models.adopter_vector import AdopterVector
+from  logic.matching_logic import (
+    MATCH_REFRESH_CHUNK_SIZE,
+    MATCHES_PER_ADOPTER,
+    delete_orphaned_matches,
+    iter_candidate_matches,
+    load_candidate_keys,
+    replace_matches,
+    stack_vectors
+)
+from  logic.vector_cache import load_catalog_arrays, catalog_from_arrays
+
+REBUILD_SHARD_SIZE = 2000
+
+_catalog = None
+
+
+def _init_worker(catalog_arrays):
+    global _catalog
+    # Connections inherited from the parent must not be shared after a fork.
+    engine.dispose(close=False)
+    _catalog = catalog_from_arrays(catalog_arrays)
+
+
+def rebuild_shard(first_user_id: int, last_user_id: int, top_k: int = MATCHES_PER_ADOPTER, similarity_threshold: float = 0.6) -> int:
+    """Replace the matches of adopters with ``first_user_id <= user_id <= last_user_id``."""
+    db = SessionLocal()
+    try:
+        adopters = stack_vectors(
+            db.query(AdopterVector.user_id, AdopterVector.vector, AdopterVector.vector_f32, AdopterVector.norm)
+            .filter(AdopterVector.user_id.between(first_user_id, last_user_id))
+            .order_by(AdopterVector.user_id)
+            .all()
+        )
+        candidate_keys = load_candidate_keys(db, adopters.ids.tolist())
+        matches = iter_candidate_matches(adopters, _catalog, candidate_keys, top_k, similarity_threshold, MATCH_REFRESH_CHUNK_SIZE)
+        for matches_by_user in matches:
+            replace_matches(matches_by_user, db)
+            db.commit()
+        return len(adopters)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def shard_bounds(user_ids, shard_size: int):
+    return [
+        (user_ids[start], user_ids[min(start + shard_size, len(user_ids)) - 1])
+        for start in range(0, len(user_ids), shard_size)
+    ]
+
+
+def rebuild_all_matches(workers: int, shard_size: int = REBUILD_SHARD_SIZE, top_k: int = MATCHES_PER_ADOPTER, similarity_threshold: float = 0.6) -> int:
+    db = SessionLocal()
+    try:
+        catalog_arrays = load_catalog_arrays(db)
+        user_ids = [user_id for (user_id,) in db.query(AdopterVector.user_id).order_by(AdopterVector.user_id)]
+    finally:
+        db.close()
+
+    shards = shard_bounds(user_ids, shard_size)
+    print(f"Rebuilding matches for {len(user_ids)} adopters against {int((catalog_arrays['status'] == 'Available').sum())} pets "
+          f"in {len(shards)} shards on {workers} workers")
+
+    started = time.perf_counter()
+    done = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(catalog_arrays,)
+    ) as pool:
+        futures = [pool.submit(rebuild_shard, first, last, top_k, similarity_threshold) for first, last in shards]
+        for future in as_completed(futures):
+            done += future.result()
+            elapsed = time.perf_counter() - started
+            print(f"{done}/{len(user_ids)} adopters  {done / elapsed:,.0f} adopters/s")
+
+    db = SessionLocal()
+    try:
+        delete_orphaned_matches(db)
+        db.commit()
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Done: {done} adopters in {elapsed:.1f} s ({done / max(elapsed, 1e-9):,.0f} adopters/s)")
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild all adopter matches in parallel.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-size", type=int, default=REBUILD_SHARD_SIZE)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    args = parser.parse_args()
+    rebuild_all_matches(args.workers, args.shard_size, MATCHES_PER_ADOPTER, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+RECOMMENDATION_CACHE_SIZE = 1024
+RECOMMENDATION_CACHE_TTL_SECONDS = 600
+RANKING_CACHE_SIZE = 4096
+
+
+class RecommendationCache:
+    """LRU + TTL cache of each user's full ranked match list.
+
+    Entries are keyed by user and stamped with the inputs the ranking was
+    computed from (adopter vector ``updated_at`` and catalog version); a
+    stamp mismatch is a miss. The last ranking is kept past a miss so a
+    recompute can tell whether anything actually changed.
+    """
+
+    def __init__(self, max_entries: int = RECOMMENDATION_CACHE_SIZE, ttl_seconds: float = RECOMMENDATION_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, stamp):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            entry_stamp, ranking, stored_at = entry
+            if entry_stamp != stamp or time.monotonic() - stored_at > self.ttl_seconds:
+                return None
+            self._entries.move_to_end(user_id)
+            return ranking
+
+    def put(self, user_id: int, stamp, ranking) -> bool:
+        """Store ``ranking``; returns False when it equals the previous one."""
+        with self._lock:
+            previous = self._entries.pop(user_id, None)
+            self._entries[user_id] = (stamp, ranking, time.monotonic())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return previous is None or previous[1] != ranking
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+def preference_signature(adopter_vector, *scope) -> bytes:
+    """Digest of an encoded adopter vector plus whatever else scopes its ranking.
+
+    Vectors are hashed as little-endian float32, the precision of
+    ``VECTOR_STORAGE=float32``, so a freshly encoded vector and its stored
+    copy share a signature in either storage mode.
+    """
+    digest = hashlib.blake2b(np.asarray(adopter_vector, dtype="<f4").tobytes(), digest_size=16)
+    digest.update(repr(scope).encode())
+    return digest.digest()
+
+
+class SignatureRankingCache:
+    """Rankings shared by every adopter who gave the same answers.
+
+    Questionnaire answers are enums and booleans, so adopters collapse onto
+    a small set of distinct vectors. Each ranking is computed on first use
+    and kept for one catalog version; a version change drops every entry.
+    """
+
+    def __init__(self, max_entries: int = RANKING_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, signature: bytes, catalog_version, compute):
+        with self._lock:
+            if catalog_version != self._version:
+                self._entries.clear()
+                self._version = catalog_version
+            ranking = self._entries.get(signature)
+            if ranking is not None:
+                self._entries.move_to_end(signature)
+                self.hits += 1
+                return ranking
+            self.misses += 1
+
+        ranking = compute()
+        with self._lock:
+            if catalog_version == self._version:
+                self._entries[signature] = ranking
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return ranking
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "catalog_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hit_rate, 4)
+            }
+
+
+recommendation_cache = RecommendationCache()
+ranking_cache = SignatureRankingCache()
@@ -3,10 +3,13 @@ from sqlalchemy.orm import Session
 from  core.database import SessionLocal
 from  models.visit_request import VisitRequest, VisitRequestStatus
 from  logic.emails import send_visit_reminder
-from  logic.matching_logic import refresh_all_matches
+from  logic.matching_logic import refresh_all_matches, refresh_matches_for_pet, refresh_matches_for_adopter, MATCHES_PER_ADOPTER
+from  logic.vector_cache import get_candidate_matrix, get_pet_catalog, hard_constraints
 from datetime import datetime, timedelta, timezone
 from  models.user import User
 from  models.pet import Pet
+from  models.user_preferences import UserPreferences
+from  models.user_training_preferences import UserTrainingPreference
 
 
 def send_reminder_emails():
@@ -45,12 +48,36 @@ def send_reminder_emails():
 def refresh_matches_job():
     db: Session = SessionLocal()
     try:
-        refresh_all_matches(db)
+        refresh_all_matches(db, get_pet_catalog(db))
     except Exception as e:
         print(f"Error in refresh_matches_job: {e}")
     finally:
         db.close()
 
+def refresh_pet_matches_job(pet_id: int):
+    db: Session = SessionLocal()
+    try:
+        refresh_matches_for_pet(pet_id, db, get_pet_catalog(db), top_k=MATCHES_PER_ADOPTER)
+    except Exception as e:
+        print(f"Error in refresh_pet_matches_job for pet {pet_id}: {e}")
+    finally:
+        db.close()
+
+def refresh_adopter_matches_job(user_id: int):
+    db: Session = SessionLocal()
+    try:
+        preferences = db.query(UserPreferences).filter(UserPreferences.user_id == user_id).first()
+        if not preferences:
+            return
+
+        traits = db.query(UserTrainingPreference).filter(UserTrainingPreference.user_id == user_id).all()
+        pet_vectors = get_candidate_matrix(db, preferences.preferred_species, **hard_constraints(preferences))
+        refresh_matches_for_adopter(user_id, preferences, traits, pet_vectors, db, top_k=MATCHES_PER_ADOPTER)
+    except Exception as e:
+        print(f"Error in refresh_adopter_matches_job for user {user_id}: {e}")
+    finally:
+        db.close()
+
 def start_scheduler():
     scheduler = BackgroundScheduler()
     
@@ -0,0 +1,69 @@
+"""Memory-mapped pet catalog snapshots shared by every worker on a host.
+
+A snapshot is a directory of ``.npy`` files, one per array, named after its
+generation (``gen-000042``). ``CURRENT`` holds the latest generation and is
+replaced atomically after the arrays are fully written, so a reader either
+sees the previous generation or the complete new one. Readers attach with
+``np.load(mmap_mode="r")``: the page cache holds one copy no matter how many
+processes map it.
+"""
+import fcntl
+import os
+import shutil
+import numpy as np
+
+KEEP_GENERATIONS = 3
+
+_CURRENT = "CURRENT"
+_LOCK = ".lock"
+
+
+def _generation_dir(directory: str, generation: int) -> str:
+    return os.path.join(directory, f"gen-{generation:06d}")
+
+
+def read_generation(directory: str):
+    """Latest published generation, or None when nothing was published yet."""
+    try:
+        with open(os.path.join(directory, _CURRENT)) as f:
+            return int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def publish_snapshot(directory: str, arrays: dict) -> int:
+    """Write ``arrays`` as the next generation and make it current."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, _LOCK), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        generation = (read_generation(directory) or 0) + 1
+        target = _generation_dir(directory, generation)
+        staging = f"{target}.tmp-{os.getpid()}"
+        os.makedirs(staging)
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+        os.replace(staging, target)
+
+        pointer = os.path.join(directory, f"{_CURRENT}.tmp-{os.getpid()}")
+        with open(pointer, "w") as f:
+            f.write(str(generation))
+        os.replace(pointer, os.path.join(directory, _CURRENT))
+
+        # Mapped files stay readable after unlinking, so pruning never breaks
+        # a worker still holding an older generation.
+        for stale in range(generation - KEEP_GENERATIONS, 0, -1):
+            path = _generation_dir(directory, stale)
+            if not os.path.isdir(path):
+                break
+            shutil.rmtree(path, ignore_errors=True)
+        return generation
+
+
+def attach_snapshot(directory: str, generation: int) -> dict:
+    """Map every array of ``generation`` read-only without copying it."""
+    path = _generation_dir(directory, generation)
+    return {
+        name[:-len(".npy")]: np.load(os.path.join(path, name), mmap_mode="r")
+        for name in os.listdir(path)
+        if name.endswith(".npy")
+    }
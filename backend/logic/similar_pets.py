@@ -0,0 +1,112 @@
+import threading
+import numpy as np
+from  logic.matching_logic import VectorMatrix, top_k_indices
+from  logic.vector_cache import get_pet_catalog
+
+SIMILAR_PETS_K = 12
+SIMILAR_PETS_REBUILD_CHUNK_SIZE = 500
+
+
+def _rank_key(neighbour):
+    pet_id, score = neighbour
+    return -score, pet_id
+
+
+class SimilarPetsIndex:
+    """Top-``k`` most similar available pets for every available pet.
+
+    The first sync scores the full pets x pets matrix in chunks. Later syncs
+    only recompute the rows of pets whose vector changed and patch their
+    column into every other pet's list; a pet's row is rescored in full only
+    when a neighbour left it and the next best pet is unknown.
+    """
+
+    def __init__(self, k: int = SIMILAR_PETS_K):
+        self.k = k
+        self.neighbours = {}
+        self.fingerprints = {}
+        self._catalog = None
+        self._lock = threading.Lock()
+
+    def _top(self, matrix: VectorMatrix, row: int, scores: np.ndarray):
+        scores = scores.copy()
+        scores[row] = -np.inf
+        return [(int(matrix.ids[i]), float(scores[i])) for i in top_k_indices(scores, self.k, -1.0)]
+
+    def rebuild(self, matrix: VectorMatrix, chunk_size: int = SIMILAR_PETS_REBUILD_CHUNK_SIZE):
+        self.neighbours = {}
+        for start in range(0, len(matrix), chunk_size):
+            chunk = matrix.subset(slice(start, start + chunk_size))
+            for offset, scores in enumerate(matrix.score_matrix(chunk)):
+                self.neighbours[int(chunk.ids[offset])] = self._top(matrix, start + offset, scores)
+        vectors = matrix.vectors
+        self.fingerprints = {int(pet_id): vectors[row].tobytes() for row, pet_id in enumerate(matrix.ids)}
+
+    def _patch_column(self, pet_id: int, scores_by_pet, dirty: set):
+        """Fold ``pet_id``'s new score into every other pet's neighbour list."""
+        for other_id, score in scores_by_pet:
+            neighbours = self.neighbours.get(other_id)
+            if neighbours is None or other_id == pet_id:
+                continue
+
+            entry = (pet_id, score)
+            if any(neighbour_id == pet_id for neighbour_id, _ in neighbours):
+                was_full = len(neighbours) >= self.k
+                weakest = neighbours[-1]
+                neighbours = [n for n in neighbours if n[0] != pet_id]
+                if was_full and _rank_key(entry) > _rank_key(weakest):
+                    self.neighbours[other_id] = neighbours
+                    dirty.add(other_id)
+                    continue
+            elif len(neighbours) >= self.k and _rank_key(entry) > _rank_key(neighbours[-1]):
+                continue
+
+            neighbours.append(entry)
+            neighbours.sort(key=_rank_key)
+            self.neighbours[other_id] = neighbours[:self.k]
+
+    def sync(self, matrix: VectorMatrix) -> int:
+        """Bring the lists in line with ``matrix``; returns the rows rescored."""
+        vectors = matrix.vectors
+        row_of = {int(pet_id): row for row, pet_id in enumerate(matrix.ids)}
+        removed = set(self.fingerprints) - set(row_of)
+        changed = [
+            pet_id for pet_id, row in row_of.items()
+            if self.fingerprints.get(pet_id) != vectors[row].tobytes()
+        ]
+        if not self.neighbours or 2 * (len(changed) + len(removed)) > len(matrix):
+            self.rebuild(matrix)
+            return len(matrix)
+
+        for pet_id in removed:
+            self.neighbours.pop(pet_id, None)
+            self.fingerprints.pop(pet_id, None)
+        dirty = {
+            pet_id for pet_id, neighbours in self.neighbours.items()
+            if any(neighbour_id in removed for neighbour_id, _ in neighbours)
+        }
+
+        for pet_id in changed:
+            row = row_of[pet_id]
+            scores = matrix.scores(vectors[row])
+            self.neighbours[pet_id] = self._top(matrix, row, scores)
+            self.fingerprints[pet_id] = vectors[row].tobytes()
+            self._patch_column(pet_id, zip(matrix.ids.tolist(), scores.tolist()), dirty)
+
+        dirty -= set(changed)
+        for pet_id in dirty:
+            row = row_of[pet_id]
+            self.neighbours[pet_id] = self._top(matrix, row, matrix.scores(vectors[row]))
+        return len(changed) + len(dirty)
+
+    def similar(self, pet_id: int, db, limit: int = SIMILAR_PETS_K):
+        """``[(pet_id, score), ...]`` for ``pet_id``, syncing to the current catalog first."""
+        catalog = get_pet_catalog(db)
+        with self._lock:
+            if catalog is not self._catalog:
+                self.sync(catalog.candidates())
+                self._catalog = catalog
+            return list(self.neighbours.get(int(pet_id), []))[:limit]
+
+
+similar_pets_index = SimilarPetsIndex()
@@ -0,0 +1,48 @@
+from itertools import groupby
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from  models.match import Match
+from  models.adopter_top_match import AdopterTopMatch
+from  logic.pet_cards import load_pet_cards
+
+TOP_MATCHES_PER_ADOPTER = 50
+
+
+def refresh_top_matches(user_ids, db, limit: int = TOP_MATCHES_PER_ADOPTER):
+    """Rebuild ``adopter_top_matches`` for ``user_ids`` from their ``matches``.
+
+    Each user keeps their ``limit`` best-scoring matches together with a
+    snapshot of the pet card, so ``/match/me`` never has to join pets. Only
+    available pets are materialized. The caller commits.
+    """
+    user_ids = sorted({int(user_id) for user_id in user_ids})
+    if not user_ids:
+        return
+
+    matches = (
+        db.query(Match.user_id, Match.pet_id, Match.match_score)
+        .filter(Match.user_id.in_(user_ids))
+        .order_by(Match.user_id, Match.match_score.desc(), Match.pet_id.desc())
+        .all()
+    )
+    cards = load_pet_cards({m.pet_id for m in matches}, db, cached=False)
+
+    rows = []
+    for user_id, user_matches in groupby(matches, key=lambda m: m.user_id):
+        ranked = [m for m in user_matches if m.pet_id in cards][:limit]
+        rows.extend(
+            {"user_id": user_id, "pet_id": m.pet_id, "match_score": m.match_score, "card": cards[m.pet_id]}
+            for m in ranked
+        )
+
+    db.execute(delete(AdopterTopMatch).where(AdopterTopMatch.user_id.in_(user_ids)))
+    if rows:
+        db.execute(pg_insert(AdopterTopMatch).values(rows))
+
+
+def users_matched_to_pet(pet_id: int, db) -> list:
+    return [user_id for (user_id,) in db.query(Match.user_id).filter(Match.pet_id == pet_id)]
+
+
+def remove_top_matches_for_pet(pet_id: int, db):
+    db.query(AdopterTopMatch).filter(AdopterTopMatch.pet_id == pet_id).delete(synchronize_session=False)
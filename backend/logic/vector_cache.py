@@ -0,0 +1,269 @@
+import threading
+import uuid
+import numpy as np
+from  models.pet import Pet
+from  models.pet_vector import PetVector
+from  core.config import settings
+from  logic.ann_index import build_index
+from  core.database import SessionLocal
+from  logic.catalog_events import get_catalog_version, bump_catalog_version
+from  logic.catalog_cache import catalog_cache
+from  logic.shared_catalog import read_generation, publish_snapshot, attach_snapshot
+from  logic.matching_logic import VectorMatrix, stack_vectors, hard_constraints
+from  logic.quantized import quantize_if_enabled
+
+FLAG_COLUMNS = ("allergy_friendly", "kid_friendly", "pet_friendly", "special_needs")
+
+_lock = threading.Lock()
+_snapshot = None
+_snapshot_version = None
+_attached_generation = None
+_local_change_pending = False
+_process_epoch = uuid.uuid4().hex[:12]
+
+
+def _as_slice(rows: np.ndarray):
+    """``rows`` as a slice when they are one contiguous run, so indexing gives views."""
+    if len(rows) == 0:
+        return slice(0, 0)
+    if rows[-1] - rows[0] + 1 == len(rows):
+        return slice(int(rows[0]), int(rows[-1]) + 1)
+    return rows
+
+
+class PetCatalogSnapshot:
+    """Vectors of every pet with species/status partitions and flag bitmasks.
+
+    Rows are put in ``_catalog_order`` when the arrays are loaded, so every
+    status/species partition, and every ``hard_constraints`` flag
+    combination inside it, is a contiguous range. Candidate matrices for
+    those are slice views of the catalog (of the mapped files in shared
+    mode). Flags without a species, and other flag combinations, fall back
+    to a copied subset.
+    """
+
+    def __init__(self, matrix: VectorMatrix, species, status, flags):
+        self.matrix = matrix
+        self.species = np.asarray(species, dtype=str)
+        self.status = np.asarray(status, dtype=str)
+        self.flags = {name: np.asarray(values, dtype=bool) for name, values in flags.items()}
+        self.partitions = {
+            key: _as_slice(np.flatnonzero((self.species == key[0]) & (self.status == key[1])))
+            for key in set(zip(self.species.tolist(), self.status.tolist()))
+        }
+        self._candidates = {}
+
+    def rows(self, species=None, status="Available", **flags):
+        """Row slice, or row numbers when they are not contiguous, of the matching pets."""
+        if species:
+            rows = self.partitions.get((species, status), slice(0, 0))
+        else:
+            rows = _as_slice(np.flatnonzero(self.status == status))
+        if not flags:
+            return rows
+
+        rows = np.arange(len(self.status))[rows]
+        mask = np.ones(len(rows), dtype=bool)
+        for name, wanted in flags.items():
+            mask &= self.flags[name][rows] == bool(wanted)
+        return _as_slice(rows[mask])
+
+    def candidates(self, species=None, status="Available", **flags) -> VectorMatrix:
+        key = (species, status, tuple(sorted(flags.items())))
+        matrix = self._candidates.get(key)
+        if matrix is None:
+            matrix = self.matrix.subset(self.rows(species, status, **flags))
+            matrix.freeze()
+            self._candidates[key] = matrix
+        return matrix
+
+    def adopter_candidates(self, preferred_species=None, **flags) -> VectorMatrix:
+        """Available pets worth scoring for an adopter.
+
+        ``flags`` restrict candidates by the boolean pet columns in
+        ``FLAG_COLUMNS``, as ``hard_constraints`` returns them. Falls back
+        to every available pet of any species when none match the species.
+        Every pipeline that ranks or stores matches scores against these.
+        """
+        species = getattr(preferred_species, "value", preferred_species)
+        if not species or species == "NoPreference":
+            return self.candidates(**flags)
+
+        pet_vectors = self.candidates(species, **flags)
+        if len(pet_vectors) == 0:
+            return self.candidates(**flags)
+        return pet_vectors
+
+
+def _catalog_order(arrays: dict) -> np.ndarray:
+    """Row order of catalog snapshots: status, species, allergy_friendly,
+    special_needs, then pet id.
+
+    special_needs runs backwards among pets that are not allergy friendly
+    (A0S1, A0S0, A1S0, A1S1), so ``allergy_friendly=True``,
+    ``special_needs=False`` and both together are each one run.
+    """
+    special_needs_run = arrays["special_needs"] ^ ~arrays["allergy_friendly"]
+    # np.lexsort takes its primary key last.
+    return np.lexsort([arrays["ids"], special_needs_run, arrays["allergy_friendly"], arrays["species"], arrays["status"]])
+
+
+def load_catalog_arrays(db) -> dict:
+    """Every array a catalog snapshot is built from, straight from Postgres."""
+    results = (
+        db.query(
+            PetVector.pet_id,
+            PetVector.vector,
+            PetVector.vector_f32,
+            PetVector.norm,
+            Pet.species,
+            Pet.status,
+            *[getattr(Pet, name) for name in FLAG_COLUMNS]
+        )
+        .join(Pet, Pet.id == PetVector.pet_id)
+        .order_by(PetVector.pet_id)
+        .all()
+    )
+    matrix = stack_vectors([(r.pet_id, r.vector, r.vector_f32, r.norm) for r in results])
+    arrays = {
+        "ids": matrix.ids,
+        "vectors": matrix.vectors,
+        "norms": matrix.norms,
+        "species": np.array([r.species.value for r in results], dtype=str),
+        "status": np.array([r.status.value if r.status is not None else "" for r in results], dtype=str)
+    }
+    for name in FLAG_COLUMNS:
+        arrays[name] = np.array([bool(getattr(r, name)) for r in results], dtype=bool)
+
+    order = _catalog_order(arrays)
+    return {name: array[order] for name, array in arrays.items()}
+
+
+def catalog_from_arrays(arrays: dict) -> PetCatalogSnapshot:
+    matrix = quantize_if_enabled(
+        VectorMatrix(arrays["ids"], arrays["vectors"], arrays["norms"]),
+        settings.MATCH_SCORING
+    )
+    return PetCatalogSnapshot(
+        matrix,
+        species=arrays["species"],
+        status=arrays["status"],
+        flags={name: arrays[name] for name in FLAG_COLUMNS}
+    )
+
+
+def load_pet_catalog(db) -> PetCatalogSnapshot:
+    return catalog_from_arrays(load_catalog_arrays(db))
+
+
+def _install(snapshot: PetCatalogSnapshot, version: int):
+    global _snapshot, _snapshot_version
+    snapshot.matrix.freeze()
+    match_index = build_index(settings.MATCH_INDEX)
+    if match_index is not None:
+        # Only pets that are new or changed since the installed snapshot are rehashed.
+        match_index.sync(snapshot.matrix, _snapshot.matrix.index if _snapshot is not None else None)
+        snapshot.matrix.index = match_index
+    _snapshot = snapshot
+    _snapshot_version = version
+
+
+def get_pet_catalog(db) -> PetCatalogSnapshot:
+    """Catalog snapshot for the current catalog version.
+
+    Only the first call after an invalidation reads ``pet_vectors``; every
+    other call returns the shared, read-only snapshot. With
+    ``CATALOG_SNAPSHOT_DIR`` set the snapshot is shared across processes.
+    """
+    if settings.CATALOG_SNAPSHOT_DIR:
+        return _get_shared_pet_catalog(db, settings.CATALOG_SNAPSHOT_DIR)
+
+    version = get_catalog_version()
+    if _snapshot is not None and _snapshot_version == version:
+        return _snapshot
+
+    snapshot = load_pet_catalog(db)
+    with _lock:
+        # The version was read before loading, so a bump that lands mid-load
+        # leaves this snapshot stale and the next caller reloads it.
+        if _snapshot_version is None or version >= _snapshot_version:
+            _install(snapshot, version)
+    return snapshot
+
+
+def _get_shared_pet_catalog(db, directory: str) -> PetCatalogSnapshot:
+    """Attach the latest published generation, publishing one first when this
+    process changed the catalog or nothing has been published yet.
+
+    Attaching a generation another worker published bumps the local catalog
+    version, so every cache keyed by it in this process drops too. Version
+    bumps relayed from other workers never publish: the worker that made the
+    change does, and this one attaches it once it appears.
+    """
+    global _attached_generation, _local_change_pending
+    generation = read_generation(directory)
+    if _snapshot is not None and generation == _attached_generation and not _local_change_pending:
+        return _snapshot
+
+    with _lock:
+        generation = read_generation(directory)
+        published = False
+        if generation is None or _local_change_pending:
+            # Cleared before loading, so a change landing mid-load publishes again.
+            _local_change_pending = False
+            generation = publish_snapshot(directory, load_catalog_arrays(db))
+            published = True
+
+        if generation != _attached_generation:
+            if _attached_generation is None or published:
+                version = get_catalog_version()
+            else:
+                version = bump_catalog_version(notify=False)
+            _install(catalog_from_arrays(attach_snapshot(directory, generation)), version)
+            _attached_generation = generation
+        return _snapshot
+
+
+@catalog_cache.before_invalidate
+def _publish_local_change(version):
+    """Publish this process's catalog change before the Redis invalidation
+    goes out, so other workers find the new generation when they hear of it."""
+    global _local_change_pending
+    if not settings.CATALOG_SNAPSHOT_DIR:
+        return
+    _local_change_pending = True
+    db = SessionLocal()
+    try:
+        _get_shared_pet_catalog(db, settings.CATALOG_SNAPSHOT_DIR)
+    except Exception as e:
+        print(f"Catalog snapshot publish failed, retrying on the next read: {e}")
+    finally:
+        db.close()
+
+
+def sync_catalog_version(db) -> int:
+    """Catalog version, after picking up snapshots other workers published."""
+    if settings.CATALOG_SNAPSHOT_DIR:
+        _get_shared_pet_catalog(db, settings.CATALOG_SNAPSHOT_DIR)
+    return get_catalog_version()
+
+
+def get_candidate_matrix(db, preferred_species=None, **flags) -> VectorMatrix:
+    """Cached available pets worth scoring for an adopter; see ``adopter_candidates``."""
+    return get_pet_catalog(db).adopter_candidates(preferred_species, **flags)
+
+
+def catalog_revision(db) -> str:
+    """Token that changes with the catalog, for HTTP validators.
+
+    Shared snapshots and the Redis catalog generation are the same in every
+    worker; only when neither is available is the local version tied to
+    this process, so workers never reuse each other's tokens.
+    """
+    version = sync_catalog_version(db)
+    if settings.CATALOG_SNAPSHOT_DIR:
+        return f"g{_attached_generation}"
+    generation = catalog_cache.shared_generation()
+    if generation is not None:
+        return f"r{generation}"
+    return f"{_process_epoch}.{version}"
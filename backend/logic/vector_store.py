@@ -0,0 +1,313 @@
+"""Keyed vector storage behind one interface.
+
+``PostgresVectorStore`` wraps the ``pet_vectors``/``adopter_vectors`` tables,
+``InMemoryVectorStore`` keeps everything in NumPy arrays for tests and
+benchmarks, and ``MmapVectorStore`` persists to a memory-mapped file. Every
+store versions its writes and keeps a bounded change feed, so caches and
+indexes layered on top can catch up incrementally.
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+import numpy as np
+from sqlalchemy.sql import func
+from  core.config import settings
+from  models.pet_vector import PetVector
+from  models.adopter_vector import AdopterVector
+
+ENCODER_VERSION = 1
+VECTOR_STORAGE_MODES = ("array", "float32")
+CHANGE_FEED_SIZE = 10000
+
+
+def vector_columns(vector: np.ndarray) -> dict:
+    """Column values for storing ``vector`` in the configured ``VECTOR_STORAGE``.
+
+    ``float32`` keeps a little-endian float32 ``bytea`` plus its L2 norm and
+    leaves the ``ARRAY(Float)`` column empty.
+    """
+    if settings.VECTOR_STORAGE == "float32":
+        packed = np.asarray(vector, dtype="<f4")
+        return {
+            "vector": None,
+            "vector_f32": packed.tobytes(),
+            "norm": float(np.linalg.norm(packed.astype(np.float64))),
+            "encoder_version": ENCODER_VERSION
+        }
+    if settings.VECTOR_STORAGE == "array":
+        return {
+            "vector": np.asarray(vector, dtype=np.float64).tolist(),
+            "vector_f32": None,
+            "norm": None,
+            "encoder_version": ENCODER_VERSION
+        }
+    raise ValueError(f"Unknown VECTOR_STORAGE {settings.VECTOR_STORAGE!r}, expected one of {VECTOR_STORAGE_MODES}")
+
+
+def decode_vector(vector, vector_f32) -> np.ndarray:
+    if vector_f32 is not None:
+        return np.frombuffer(vector_f32, dtype="<f4")
+    return np.asarray(vector, dtype=np.float64)
+
+
+class ChangeFeed:
+    """Monotonic version counter plus the keys each version touched."""
+
+    def __init__(self, size: int = CHANGE_FEED_SIZE):
+        self.version = 0
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, keys, deleted: bool = False) -> int:
+        with self._lock:
+            self.version += 1
+            self._entries.append((self.version, tuple(int(key) for key in keys), deleted))
+            return self.version
+
+    def since(self, version: int):
+        """``(current_version, upserted_keys, deleted_keys)`` after ``version``.
+
+        Returns None when the feed no longer reaches back that far and the
+        caller has to reload everything.
+        """
+        with self._lock:
+            if version < self.version and (not self._entries or self._entries[0][0] > version + 1):
+                return None
+            upserted, deleted = set(), set()
+            for entry_version, keys, was_deleted in self._entries:
+                if entry_version <= version:
+                    continue
+                for key in keys:
+                    (deleted if was_deleted else upserted).add(key)
+                    (upserted if was_deleted else deleted).discard(key)
+            return self.version, upserted, deleted
+
+
+class VectorStore(ABC):
+    """Interface shared by every vector backend."""
+
+    def __init__(self, feed: ChangeFeed = None):
+        self.feed = feed or ChangeFeed()
+
+    @property
+    def version(self) -> int:
+        return self.feed.version
+
+    def changes_since(self, version: int):
+        return self.feed.since(version)
+
+    def record_changes(self, keys, deleted: bool = False) -> int:
+        """Log writes made outside the store, e.g. inside a larger transaction.
+
+        Call after they are committed, so a reader of the feed never reloads
+        a key before its new value is visible.
+        """
+        return self.feed.record(keys, deleted)
+
+    @abstractmethod
+    def get_many(self, keys) -> dict:
+        ...
+
+    @abstractmethod
+    def put_many(self, vectors: dict) -> int:
+        ...
+
+    @abstractmethod
+    def delete_many(self, keys) -> int:
+        ...
+
+    @abstractmethod
+    def all(self):
+        """Every ``(ids, vectors)`` pair as two aligned arrays, ordered by key."""
+
+    def get(self, key: int):
+        return self.get_many([key]).get(int(key))
+
+    def put(self, key: int, vector) -> int:
+        return self.put_many({key: vector})
+
+
+class InMemoryVectorStore(VectorStore):
+    def __init__(self, dim: int = None, feed: ChangeFeed = None):
+        super().__init__(feed)
+        self.dim = dim
+        self._vectors = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys) -> dict:
+        with self._lock:
+            return {int(key): self._vectors[int(key)] for key in keys if int(key) in self._vectors}
+
+    def put_many(self, vectors: dict) -> int:
+        with self._lock:
+            for key, vector in vectors.items():
+                vector = np.array(vector, dtype=np.float64)
+                if self.dim is None:
+                    self.dim = vector.shape[0]
+                if vector.shape != (self.dim,):
+                    raise ValueError(f"Vector shape mismatch: {vector.shape} vs {(self.dim,)}")
+                vector.flags.writeable = False
+                self._vectors[int(key)] = vector
+        return self.feed.record(vectors)
+
+    def delete_many(self, keys) -> int:
+        keys = [int(key) for key in keys]
+        with self._lock:
+            for key in keys:
+                self._vectors.pop(key, None)
+        return self.feed.record(keys, deleted=True)
+
+    def all(self):
+        with self._lock:
+            ids = np.array(sorted(self._vectors), dtype=np.int64)
+            vectors = np.array([self._vectors[key] for key in ids.tolist()]).reshape(len(ids), self.dim or 0)
+            return ids, vectors
+
+
+_table_feeds = {}
+_table_feeds_lock = threading.Lock()
+
+
+def _table_feed(table_name: str) -> ChangeFeed:
+    with _table_feeds_lock:
+        return _table_feeds.setdefault(table_name, ChangeFeed())
+
+
+class PostgresVectorStore(VectorStore):
+    """``pet_vectors``/``adopter_vectors`` through a session.
+
+    Stores are cheap and built per session; the change feed is shared by
+    every store on the same table in this process. Writes commit.
+    """
+
+    def __init__(self, db, model, key_column):
+        super().__init__(_table_feed(model.__tablename__))
+        self.db = db
+        self.model = model
+        self.key_column = key_column
+
+    def get_many(self, keys) -> dict:
+        """``keys`` may also be a ``select()`` of keys."""
+        rows = (
+            self.db.query(self.key_column, self.model.vector, self.model.vector_f32)
+            .filter(self.key_column.in_(keys))
+            .all()
+        )
+        return {row[0]: decode_vector(row.vector, row.vector_f32) for row in rows}
+
+    def put_many(self, vectors: dict) -> int:
+        for key, vector in vectors.items():
+            self.db.merge(self.model(
+                **{self.key_column.key: int(key)},
+                updated_at=func.now(),
+                **vector_columns(vector)
+            ))
+        self.db.commit()
+        return self.feed.record(vectors)
+
+    def delete_many(self, keys) -> int:
+        keys = [int(key) for key in keys]
+        self.db.query(self.model).filter(self.key_column.in_(keys)).delete(synchronize_session=False)
+        self.db.commit()
+        return self.feed.record(keys, deleted=True)
+
+    def all(self):
+        rows = (
+            self.db.query(self.key_column, self.model.vector, self.model.vector_f32)
+            .order_by(self.key_column)
+            .all()
+        )
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        vectors = np.array([decode_vector(row.vector, row.vector_f32) for row in rows], dtype=np.float64)
+        return ids, vectors.reshape(len(ids), -1) if len(ids) else np.empty((0, 0))
+
+
+class MmapVectorStore(VectorStore):
+    """Vectors in a memory-mapped ``.npy`` file with a parallel key file.
+
+    Rows are overwritten in place; deleted rows are recycled and the files
+    double in capacity when full. Reads return copies so callers never hold
+    a view into a row that may be reused.
+    """
+
+    def __init__(self, directory: str, dim: int, capacity: int = 1024, feed: ChangeFeed = None):
+        super().__init__(feed)
+        self.directory = directory
+        self.dim = dim
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self._path("keys")):
+            self._keys = np.load(self._path("keys"), mmap_mode="r+")
+            self._vectors = np.load(self._path("vectors"), mmap_mode="r+")
+        else:
+            self._keys, self._vectors = self._allocate(capacity)
+        self._row_of = {int(key): row for row, key in enumerate(self._keys) if key >= 0}
+        self._free = [row for row, key in enumerate(self._keys) if key < 0]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.npy")
+
+    def _allocate(self, capacity: int):
+        keys = np.lib.format.open_memmap(self._path("keys"), mode="w+", dtype=np.int64, shape=(capacity,))
+        keys[:] = -1
+        vectors = np.lib.format.open_memmap(self._path("vectors"), mode="w+", dtype=np.float64, shape=(capacity, self.dim))
+        return keys, vectors
+
+    def _grow(self):
+        old_keys, old_vectors = np.array(self._keys), np.array(self._vectors)
+        self._keys, self._vectors = self._allocate(2 * len(old_keys))
+        self._keys[:len(old_keys)] = old_keys
+        self._vectors[:len(old_vectors)] = old_vectors
+        self._free.extend(range(len(old_keys), len(self._keys)))
+
+    def get_many(self, keys) -> dict:
+        with self._lock:
+            return {
+                int(key): np.array(self._vectors[self._row_of[int(key)]])
+                for key in keys if int(key) in self._row_of
+            }
+
+    def put_many(self, vectors: dict) -> int:
+        with self._lock:
+            for key, vector in vectors.items():
+                vector = np.asarray(vector, dtype=np.float64)
+                if vector.shape != (self.dim,):
+                    raise ValueError(f"Vector shape mismatch: {vector.shape} vs {(self.dim,)}")
+                row = self._row_of.get(int(key))
+                if row is None:
+                    if not self._free:
+                        self._grow()
+                    row = self._free.pop(0)
+                    self._row_of[int(key)] = row
+                    self._keys[row] = int(key)
+                self._vectors[row] = vector
+            self._keys.flush()
+            self._vectors.flush()
+        return self.feed.record(vectors)
+
+    def delete_many(self, keys) -> int:
+        keys = [int(key) for key in keys]
+        with self._lock:
+            for key in keys:
+                row = self._row_of.pop(key, None)
+                if row is not None:
+                    self._keys[row] = -1
+                    self._free.append(row)
+            self._free.sort()
+            self._keys.flush()
+        return self.feed.record(keys, deleted=True)
+
+    def all(self):
+        with self._lock:
+            ids = np.array(sorted(self._row_of), dtype=np.int64)
+            rows = [self._row_of[key] for key in ids.tolist()]
+            return ids, np.array(self._vectors[rows]).reshape(len(ids), self.dim)
+
+
+def pet_vector_store(db) -> PostgresVectorStore:
+    return PostgresVectorStore(db, PetVector, PetVector.pet_id)
+
+
+def adopter_vector_store(db) -> PostgresVectorStore:
+    return PostgresVectorStore(db, AdopterVector, AdopterVector.user_id)
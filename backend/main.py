@@ -13,6 +13,7 @@ from starlette.datastructures import MutableHeaders
 from starlette.responses import Response as StarletteResponse
 
 from logic.scheduler import start_scheduler
+from core.pagination import NEXT_CURSOR_HEADER
 from rate_limiter import apply_rate_limiting
 from core.config import settings
 from routers import (
@@ -179,6 +180,7 @@ middleware = [
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     ),
     Middleware(SecurityHeadersMiddleware),
     Middleware(
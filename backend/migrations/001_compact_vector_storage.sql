@@ -0,0 +1,15 @@
+-- Compact float32 storage for pet and adopter vectors (VECTOR_STORAGE=float32).
+-- Apply before switching the setting, then convert existing rows with
+--   python -m logic.migrate_vectors
+
+ALTER TABLE pet_vectors
+    ALTER COLUMN vector DROP NOT NULL,
+    ADD COLUMN IF NOT EXISTS vector_f32 BYTEA,
+    ADD COLUMN IF NOT EXISTS norm DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS encoder_version SMALLINT;
+
+ALTER TABLE adopter_vectors
+    ALTER COLUMN vector DROP NOT NULL,
+    ADD COLUMN IF NOT EXISTS vector_f32 BYTEA,
+    ADD COLUMN IF NOT EXISTS norm DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS encoder_version SMALLINT;
@@ -0,0 +1,15 @@
+-- Materialized per-adopter top matches with pet card snapshots, served by
+-- GET /api/match/me. Rows are written by the match refresh pipelines; the
+-- next nightly refresh_matches_job backfills every adopter.
+
+CREATE TABLE IF NOT EXISTS adopter_top_matches (
+    user_id INTEGER NOT NULL REFERENCES users (id),
+    pet_id INTEGER NOT NULL REFERENCES pets (id),
+    match_score DOUBLE PRECISION NOT NULL,
+    card JSONB NOT NULL,
+    refreshed_at TIMESTAMP DEFAULT now(),
+    PRIMARY KEY (user_id, pet_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_adopter_top_matches_user_rank
+    ON adopter_top_matches (user_id, match_score DESC, pet_id DESC);
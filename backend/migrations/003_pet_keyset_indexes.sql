@@ -0,0 +1,8 @@
+-- Composite indexes behind keyset pagination of GET /api/pets, ordered by
+-- (created_at DESC, id DESC) with and without the status filter.
+
+CREATE INDEX IF NOT EXISTS ix_pets_status_created_at_id
+    ON pets (status, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS ix_pets_created_at_id
+    ON pets (created_at DESC, id DESC);
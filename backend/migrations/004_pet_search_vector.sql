@@ -0,0 +1,14 @@
+-- Full-text search over pet name, breed, shelter notes and AI summary, used
+-- by GET /api/pets/search/text. The column is generated, so every insert and
+-- update of a pet keeps it current in the same statement.
+
+ALTER TABLE pets ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(breed, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(shelter_notes, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'D')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_pets_search_vector
+    ON pets USING GIN (search_vector);
@@ -7,5 +7,6 @@ from .match import Match
 from .visit_request import VisitRequest, VisitRequestStatus
 from .pet_vector import PetVector
 from .adopter_vector import AdopterVector
+from .adopter_top_match import AdopterTopMatch
 from  core.database import Base
 
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, Float, TIMESTAMP, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from  core.database import Base
+from sqlalchemy.sql import func
+
+class AdopterTopMatch(Base):
+    __tablename__ = "adopter_top_matches"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    pet_id = Column(Integer, ForeignKey("pets.id"), primary_key=True)
+    match_score = Column(Float, nullable=False)
+    card = Column(JSONB, nullable=False)
+    refreshed_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_adopter_top_matches_user_rank", "user_id", match_score.desc(), pet_id.desc()),
+    )
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, TIMESTAMP, ForeignKey, ARRAY, Float
+from sqlalchemy import Column, Integer, SmallInteger, TIMESTAMP, ForeignKey, ARRAY, Float, LargeBinary
 from  core.database import Base
 from sqlalchemy.sql import func
 
 class AdopterVector(Base):
     __tablename__ = "adopter_vectors"
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
-    vector = Column(ARRAY(Float), nullable=False)
+    vector = Column(ARRAY(Float))
+    vector_f32 = Column(LargeBinary)
+    norm = Column(Float)
+    encoder_version = Column(SmallInteger)
     updated_at = Column(TIMESTAMP, server_default=func.now())
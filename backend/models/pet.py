@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, Enum, TIMESTAMP, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, Text, Enum, TIMESTAMP, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from  core.database import Base
 import enum
 from sqlalchemy.sql import func
@@ -71,4 +72,17 @@ class Pet(Base):
     image_url = Column(Text)
     summary = Column(Text)
     status = Column(Enum(PetStatus), default=PetStatus.Available)
-    created_at = Column(TIMESTAMP, server_default=func.now())
\ No newline at end of file
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(breed, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(shelter_notes, '')), 'C') || "
+        "setweight(to_tsvector('english', coalesce(summary, '')), 'D')",
+        persisted=True
+    )))
+
+    __table_args__ = (
+        Index("ix_pets_status_created_at_id", "status", created_at.desc(), id.desc()),
+        Index("ix_pets_created_at_id", created_at.desc(), id.desc()),
+        Index("ix_pets_search_vector", "search_vector", postgresql_using="gin"),
+    )
\ No newline at end of file
@@ -1,24 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Response
+from sqlalchemy import tuple_
+from typing import Optional
 from sqlalchemy.orm import Session
 from  core.database import get_db
 from  core.dependencies import get_current_user
-from  models.user import User
-from  models.user_preferences import UserPreferences
+from  models.user import User, UserRole
+from  models.user_preferences import UserPreferences, OwnershipExperience
 from  models.user_training_preferences import UserTrainingPreference
-from  schemas.preferences_schema import PreferencesSchema
+from  schemas.preferences_schema import PreferencesSchema, MatchPreviewRequest
 from  schemas.training_schema import TraitInput
 from  models.pet import Pet
 from  models.pet_training_traits import PetTrainingTrait
 from  schemas.pet_schema import PetResponse
 from  models.match import Match
+from  models.pet_vector import PetVector
+from  models.adopter_top_match import AdopterTopMatch
+from  core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
 from  logic.matching_logic import (
     save_adopter_vector,
+    build_adopter_vector,
     save_pet_vector,
-    load_adopter_vector,
-    load_pet_vectors,
+    load_adopter_vector_record,
+    decode_vector,
     get_top_pet_matches,
-    save_matches_for_user
+    save_matches_for_user,
+    RECOMMENDATION_TOP_K
 )
+from  logic.vector_cache import get_candidate_matrix, hard_constraints, sync_catalog_version
+from  logic.recommendation_cache import recommendation_cache, ranking_cache, preference_signature
+from  logic.pet_cards import load_pet_cards
+from  logic.top_matches import TOP_MATCHES_PER_ADOPTER
+from  logic.adopter_cache import adopter_matrix_cache
+from  logic.scheduler import refresh_pet_matches_job
 from fastapi import Query
 
 
@@ -59,6 +72,7 @@ def refresh_adopter_vector(
 @router.post("/pets/{pet_id}/refresh-vector")
 def refresh_pet_vector(
     pet_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -74,11 +88,50 @@ def refresh_pet_vector(
 
     pet_response = PetResponse(**{k: v for k, v in pet.__dict__.items() if not k.startswith("_")})
     save_pet_vector(pet_response, trait_enums, db)
+    background_tasks.add_task(refresh_pet_matches_job, pet_id)
 
     return {"message": f"Vector for pet {pet_id} successfully updated"}
 
 
 
+@router.get("/pets/{pet_id}/adopters")
+def get_top_adopters_for_pet(
+    pet_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    threshold: float = Query(0.6, ge=0, le=1),
+    has_children: Optional[bool] = Query(None),
+    experience: Optional[OwnershipExperience] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != UserRole.Admin:
+        raise HTTPException(status_code=403, detail="Only admins can view adopter matches")
+
+    record = db.query(PetVector.vector, PetVector.vector_f32).filter(PetVector.pet_id == pet_id).first()
+    if record is None:
+        raise HTTPException(status_code=404, detail="Pet vector not found")
+
+    top_adopters = adopter_matrix_cache.top_adopters(
+        decode_vector(record.vector, record.vector_f32),
+        db,
+        top_k=limit,
+        similarity_threshold=threshold,
+        has_children=has_children,
+        experience=experience
+    )
+    users = {
+        user.id: user
+        for user in db.query(User.id, User.full_name, User.email).filter(User.id.in_([user_id for user_id, _ in top_adopters]))
+    }
+
+    return [{
+        "user_id": user_id,
+        "full_name": users[user_id].full_name,
+        "email": users[user_id].email,
+        "score": round(score, 3)
+    } for user_id, score in top_adopters if user_id in users]
+
+
 @router.get("/recommendations")
 def get_pet_recommendations(
     background_tasks: BackgroundTasks,
@@ -97,80 +150,42 @@ def get_pet_recommendations(
             prefs_dict, traits_list = get_user_preferences_and_traits(current_user.id, db)
             save_adopter_vector(current_user.id, prefs_dict, traits_list, db)
         
-        adopter_vector = load_adopter_vector(current_user.id, db)
+        adopter_vector, vector_updated_at = load_adopter_vector_record(current_user.id, db)
         if not adopter_vector:
             prefs_dict, traits_list = get_user_preferences_and_traits(current_user.id, db)
             save_adopter_vector(current_user.id, prefs_dict, traits_list, db)
-            adopter_vector = load_adopter_vector(current_user.id, db)
+            adopter_vector, vector_updated_at = load_adopter_vector_record(current_user.id, db)
             
             if not adopter_vector:
                 raise HTTPException(status_code=400, detail="Could not generate adopter vector")
 
-        pet_vectors = load_pet_vectors(db)
-        if not pet_vectors:
-            return []
-
-        if preferences.preferred_species and preferences.preferred_species != "NoPreference":
-            matching_pets = db.query(Pet.id).filter(
-                Pet.species == preferences.preferred_species,
-                Pet.status == "Available"
-            ).all()
-            matching_pet_ids = {pet_id for (pet_id,) in matching_pets}
-            
-            filtered_pet_vectors = [
-                (pet_id, vector) for pet_id, vector in pet_vectors 
-                if pet_id in matching_pet_ids
-            ]
-            if filtered_pet_vectors:
-                pet_vectors = filtered_pet_vectors
-            else:
-                pass
-        elif preferences.preferred_species == "NoPreference":
-            pass
-
-        top_matches = get_top_pet_matches(adopter_vector, pet_vectors, top_k=50)
+        catalog_version = sync_catalog_version(db)
+        ranking_stamp = (vector_updated_at, catalog_version)
+        top_matches = recommendation_cache.get(current_user.id, ranking_stamp)
+        if top_matches is None:
+            species = getattr(preferences.preferred_species, "value", preferences.preferred_species)
+            constraints = hard_constraints(preferences)
+            top_matches = ranking_cache.get_or_compute(
+                preference_signature(adopter_vector, species, sorted(constraints.items())),
+                catalog_version,
+                lambda: get_top_pet_matches(
+                    adopter_vector,
+                    get_candidate_matrix(db, preferences.preferred_species, **constraints),
+                    top_k=RECOMMENDATION_TOP_K
+                )
+            )
+            if recommendation_cache.put(current_user.id, ranking_stamp, top_matches):
+                background_tasks.add_task(save_matches_for_user, current_user.id, top_matches, db)
         
         skip = (page - 1) * pageSize
         paginated_matches = top_matches[skip:skip + pageSize]
-        
-        background_tasks.add_task(save_matches_for_user, current_user.id, top_matches, db)
-
-        pet_ids = [pid for pid, _ in paginated_matches]
-        pets = db.query(Pet).filter(Pet.id.in_(pet_ids), Pet.status == "Available").all()
-        pet_map = {pet.id: pet for pet in pets}
-
-        pet_traits = {}
-        for pet_id in pet_ids:
-            traits = db.query(PetTrainingTrait).filter(PetTrainingTrait.pet_id == pet_id).all()
-            pet_traits[pet_id] = [t.trait.name for t in traits]
-
-        results = []
-        for pet_id, score in paginated_matches:
-            pet = pet_map.get(pet_id)
-            if pet:
-                pet_data = {
-                    "id": pet.id,
-                    "name": pet.name,
-                    "species": pet.species.value,
-                    "breed": pet.breed,
-                    "age_group": pet.age_group.value,
-                    "sex": pet.sex.value,
-                    "size": pet.size.value if pet.size else None,
-                    "energy_level": pet.energy_level.value if pet.energy_level else None,
-                    "experience_level": pet.experience_level.value if pet.experience_level else None,
-                    "hair_length": pet.hair_length.value if pet.hair_length else None,
-                    "allergy_friendly": pet.allergy_friendly,
-                    "special_needs": pet.special_needs,
-                    "kid_friendly": pet.kid_friendly,
-                    "pet_friendly": pet.pet_friendly,
-                    "shelter_notes": pet.shelter_notes,
-                    "summary": pet.summary,
-                    "image_url": str(pet.image_url) if pet.image_url else None,
-                    "status": pet.status.value,
-                    "training_traits": pet_traits.get(pet_id, []),
-                    "match_score": float(score)  
-                }
-                results.append(pet_data)
+
+        pet_cards = load_pet_cards([pet_id for pet_id, _ in paginated_matches], db)
+        results = [
+            {**pet_cards[pet_id], "match_score": float(score)}
+            for pet_id, score in paginated_matches
+            if pet_id in pet_cards
+        ]
 
         return results
 
@@ -178,20 +193,79 @@ def get_pet_recommendations(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/preview")
+def preview_pet_recommendations(
+    request: MatchPreviewRequest,
+    page: int = Query(1, ge=1),
+    pageSize: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Rank pets for unsaved questionnaire answers without writing anything."""
+    preferences = request.preferences
+    adopter_vector = build_adopter_vector(preferences, request.training_traits)
+    constraints = hard_constraints(preferences)
+    top_matches = ranking_cache.get_or_compute(
+        preference_signature(adopter_vector, preferences.preferred_species.value, sorted(constraints.items())),
+        sync_catalog_version(db),
+        lambda: get_top_pet_matches(
+            adopter_vector,
+            get_candidate_matrix(db, preferences.preferred_species, **constraints),
+            top_k=RECOMMENDATION_TOP_K
+        )
+    )
+
+    skip = (page - 1) * pageSize
+    paginated_matches = top_matches[skip:skip + pageSize]
+    pet_cards = load_pet_cards([pet_id for pet_id, _ in paginated_matches], db)
+    return [
+        {**pet_cards[pet_id], "match_score": float(score)}
+        for pet_id, score in paginated_matches
+        if pet_id in pet_cards
+    ]
+
+
+@router.get("/ranking-cache/stats")
+def get_ranking_cache_stats(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.Admin:
+        raise HTTPException(status_code=403, detail="Only admins can view cache statistics")
+    return ranking_cache.stats()
+
+
 @router.get("/me", response_model=list[dict])
 def get_saved_matches(
+    response: Response,
+    limit: int = Query(TOP_MATCHES_PER_ADOPTER, ge=1, le=TOP_MATCHES_PER_ADOPTER),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    matches = (
-        db.query(Match, Pet)
-        .join(Pet, Match.pet_id == Pet.id)
-        .filter(Match.user_id == current_user.id)
-        .order_by(Match.match_score.desc())
-        .all()
+    """Saved matches, best first, paged with the ``X-Next-Cursor`` header.
+
+    Reads ``adopter_top_matches`` alone: one range scan of its
+    ``(user_id, match_score DESC, pet_id DESC)`` index.
+    """
+    query = db.query(AdopterTopMatch.pet_id, AdopterTopMatch.match_score, AdopterTopMatch.card).filter(
+        AdopterTopMatch.user_id == current_user.id
     )
+    if cursor:
+        after_score, after_pet_id = decode_cursor(cursor, 2)
+        try:
+            after_score, after_pet_id = float(after_score), int(after_pet_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(
+            tuple_(AdopterTopMatch.match_score, AdopterTopMatch.pet_id) < tuple_(after_score, after_pet_id)
+        )
+    matches = query.order_by(
+        AdopterTopMatch.match_score.desc(), AdopterTopMatch.pet_id.desc()
+    ).limit(limit + 1).all()
+
+    if len(matches) > limit:
+        matches = matches[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(matches[-1].match_score, matches[-1].pet_id)
 
     return [{
-        "pet": PetResponse(**{k: v for k, v in pet.__dict__.items() if not k.startswith("_")}),
+        "pet": match.card,
         "score": round(match.match_score, 3)
-    } for match, pet in matches]
+    } for match in matches]
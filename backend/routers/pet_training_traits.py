@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from  core.database import get_db
 from  core.dependencies import get_current_user
 from  models.pet_training_traits import PetTrainingTrait, TrainingTrait
 from  models.user import UserRole
+from  logic.catalog_events import bump_catalog_version
+from  logic.vector_cache import catalog_revision
+from  core.http_cache import make_etag, check_not_modified, PUBLIC_SHORT
 from fastapi import Body
 
 
@@ -12,8 +15,14 @@ router = APIRouter(prefix="/pets", tags=["Pet Training Traits"])
 @router.get("/{pet_id}/training-traits", response_model=list[TrainingTrait])
 def get_training_traits(
     pet_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
+    not_modified = check_not_modified(request, response, make_etag("traits", catalog_revision(db), pet_id), PUBLIC_SHORT)
+    if not_modified:
+        return not_modified
+
     traits = db.query(PetTrainingTrait).filter(PetTrainingTrait.pet_id == pet_id).all()
     return [t.trait for t in traits]
 
@@ -28,6 +37,7 @@ def add_training_trait(
         raise HTTPException(status_code=403, detail="Only admins can add traits")
     db.add(PetTrainingTrait(pet_id=pet_id, trait=trait))
     db.commit()
+    bump_catalog_version()
     return {"message": "Trait added"}
 
 @router.delete("/{pet_id}/training-traits/{trait}")
@@ -46,6 +56,7 @@ def remove_training_trait(
     db.commit()
     if not deleted:
         raise HTTPException(status_code=404, detail="Trait not found")
+    bump_catalog_version()
     return {"message": "Trait removed"}
 
 pet_training_traits_router = router
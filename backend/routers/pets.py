@@ -1,21 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Response, Form
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Response, Form, BackgroundTasks, Query, Request
 from typing import List, Optional
 import requests
 from sqlalchemy.orm import Session
 from fastapi.responses import FileResponse
 from pathlib import Path
+from datetime import datetime
+from sqlalchemy import tuple_
 
 from  core.database import get_db
 import models
 from  logic.image_uploader import upload_pet_photo_local
-from  schemas.pet_schema import PetResponse
+from  schemas.pet_schema import PetResponse, PetSpecies, PetSize, PetEnergyLevel, PetAgeGroup, HairLength, PetSex, ExperienceLevel, PetStatus
 from  core.dependencies import get_optional_user, get_current_user
 from  models.user import User, UserRole
-from  models.pet_vector import PetVector
 from  logic.matching_logic import build_pet_vector
-from  models.pet_training_traits import PetTrainingTrait
+from  logic.vector_store import pet_vector_store
+from  models.pet_training_traits import PetTrainingTrait, TrainingTrait
 from  logic.OpenAI_API_Logic import pet_ai_service
+from  logic.catalog_events import bump_catalog_version
+from  logic.scheduler import refresh_pet_matches_job
+from  logic.top_matches import remove_top_matches_for_pet
+from  logic.similar_pets import similar_pets_index, SIMILAR_PETS_K
+from  logic.pet_cards import load_pet_cards
+from  logic.catalog_cache import catalog_cache
+from  logic.facet_index import pet_facet_index
+from  logic.pet_search import pet_search
 from  core.config import settings
+from  core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from  core.http_cache import make_etag, check_not_modified, PUBLIC_REVALIDATE, PUBLIC_SHORT, PUBLIC_LONG, PRIVATE_REVALIDATE
+from  logic.vector_cache import catalog_revision
 
 
 router = APIRouter(prefix="/pets", tags=["Pets"])
@@ -25,35 +38,201 @@ def _ensure_absolute_image_url(pet):
         pet.image_url = f"{settings.BASE_URL}{pet.image_url}"
     return pet
 
+def _pet_payload(pet) -> dict:
+    return PetResponse.model_validate(_ensure_absolute_image_url(pet)).model_dump(mode="json")
+
 @router.get("/", response_model=List[PetResponse])
 def read_pets(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_optional_user)
 ):
-    query = db.query(models.Pet)
-    
-    if status:
-        query = query.filter(models.Pet.status == status)
-    elif current_user is None or current_user.role != UserRole.Admin:
-        query = query.filter(models.Pet.status == "Available")
-    pets = query.order_by(models.Pet.created_at.desc()).offset(skip).limit(limit).all()
-    return [_ensure_absolute_image_url(pet) for pet in pets]
+    """Newest pets first. Pass the ``X-Next-Cursor`` response header back as
+    ``cursor`` to continue after the last pet at constant cost; ``skip`` is
+    ignored when a cursor is given."""
+    is_admin = current_user is not None and current_user.role == UserRole.Admin
+    not_modified = check_not_modified(
+        request, response,
+        make_etag("pets", catalog_revision(db), skip, limit, status, cursor, is_admin),
+        PRIVATE_REVALIDATE if is_admin else PUBLIC_REVALIDATE,
+        vary="Authorization, Cookie"
+    )
+    if not_modified:
+        return not_modified
+
+    def load_page():
+        query = db.query(models.Pet)
+
+        if status:
+            query = query.filter(models.Pet.status == status)
+        elif not is_admin:
+            query = query.filter(models.Pet.status == "Available")
+
+        if cursor:
+            created_at, pet_id = decode_cursor(cursor, 2)
+            try:
+                created_at, pet_id = datetime.fromisoformat(created_at), int(pet_id)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.filter(tuple_(models.Pet.created_at, models.Pet.id) < tuple_(created_at, pet_id))
+        else:
+            query = query.offset(skip)
+
+        pets = query.order_by(models.Pet.created_at.desc(), models.Pet.id.desc()).limit(limit + 1).all()
+        next_cursor = None
+        if len(pets) > limit:
+            pets = pets[:limit]
+            next_cursor = encode_cursor(pets[-1].created_at, pets[-1].id)
+        return {
+            "pets": [_pet_payload(pet) for pet in pets],
+            "next_cursor": next_cursor
+        }
+
+    page = catalog_cache.get_or_load("pets", [skip, limit, status, cursor, is_admin], load_page)
+    if page["next_cursor"]:
+        response.headers[NEXT_CURSOR_HEADER] = page["next_cursor"]
+    return page["pets"]
+
+@router.get("/search")
+def search_pets(
+    request: Request,
+    response: Response,
+    species: Optional[List[PetSpecies]] = Query(None),
+    size: Optional[List[PetSize]] = Query(None),
+    energy_level: Optional[List[PetEnergyLevel]] = Query(None),
+    age_group: Optional[List[PetAgeGroup]] = Query(None),
+    hair_length: Optional[List[HairLength]] = Query(None),
+    sex: Optional[List[PetSex]] = Query(None),
+    experience_level: Optional[List[ExperienceLevel]] = Query(None),
+    status: Optional[List[PetStatus]] = Query(None),
+    allergy_friendly: Optional[bool] = None,
+    kid_friendly: Optional[bool] = None,
+    pet_friendly: Optional[bool] = None,
+    special_needs: Optional[bool] = None,
+    training_traits: Optional[List[TrainingTrait]] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """Filter pets and count every facet value. Repeat a parameter to accept
+    several values of it; every requested training trait is required."""
+    is_admin = current_user is not None and current_user.role == UserRole.Admin
+    not_modified = check_not_modified(
+        request, response,
+        make_etag("search", catalog_revision(db), sorted(request.query_params.multi_items()), is_admin),
+        PRIVATE_REVALIDATE if is_admin else PUBLIC_REVALIDATE,
+        vary="Authorization, Cookie"
+    )
+    if not_modified:
+        return not_modified
+
+    if not status and not is_admin:
+        status = [PetStatus.Available]
+    result = pet_facet_index.search(
+        db,
+        filters={
+            "species": species, "size": size, "energy_level": energy_level, "age_group": age_group,
+            "hair_length": hair_length, "sex": sex, "experience_level": experience_level, "status": status,
+        },
+        flags={
+            "allergy_friendly": allergy_friendly, "kid_friendly": kid_friendly,
+            "pet_friendly": pet_friendly, "special_needs": special_needs,
+        },
+        traits=training_traits or [],
+        offset=skip,
+        limit=limit
+    )
+    pet_cards = load_pet_cards(result["pet_ids"], db, available_only=False)
+    return {
+        "total": result["total"],
+        "pets": [pet_cards[pet_id] for pet_id in result["pet_ids"] if pet_id in pet_cards],
+        "facets": result["facets"]
+    }
+
+@router.get("/search/text")
+def search_pets_text(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    status: Optional[PetStatus] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """Pets whose name, breed, shelter notes or summary match ``q``, best
+    first, with the matching fields excerpted and matches in ``<mark>``."""
+    is_admin = current_user is not None and current_user.role == UserRole.Admin
+    not_modified = check_not_modified(
+        request, response,
+        make_etag("text-search", catalog_revision(db), q, status, skip, limit, is_admin),
+        PRIVATE_REVALIDATE if is_admin else PUBLIC_REVALIDATE,
+        vary="Authorization, Cookie"
+    )
+    if not_modified:
+        return not_modified
+
+    if not status and not is_admin:
+        status = PetStatus.Available
+    result = pet_search.search(q, db, status=status, offset=skip, limit=limit)
+    pet_cards = load_pet_cards([match["pet_id"] for match in result["results"]], db, available_only=False)
+    return {
+        "total": result["total"],
+        "results": [{
+            "pet": pet_cards[match["pet_id"]],
+            "rank": match["rank"],
+            "highlights": match["highlights"]
+        } for match in result["results"] if match["pet_id"] in pet_cards]
+    }
 
 @router.get("/{pet_id}", response_model=PetResponse)
-def read_pet(pet_id: int, db: Session = Depends(get_db)):
-    pet = db.query(models.Pet).filter(models.Pet.id == pet_id).first()
+def read_pet(pet_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    not_modified = check_not_modified(request, response, make_etag("pet", catalog_revision(db), pet_id), PUBLIC_SHORT)
+    if not_modified:
+        return not_modified
+
+    def load_pet():
+        pet = db.query(models.Pet).filter(models.Pet.id == pet_id).first()
+        return _pet_payload(pet) if pet else None
+
+    pet = catalog_cache.get_or_load("pet", [pet_id], load_pet)
     if not pet:
         raise HTTPException(status_code=404, detail="Pet not found")
-    return _ensure_absolute_image_url(pet)
+    return pet
+
+@router.get("/{pet_id}/similar")
+def read_similar_pets(
+    pet_id: int,
+    limit: int = Query(6, ge=1, le=SIMILAR_PETS_K),
+    db: Session = Depends(get_db)
+):
+    if not db.query(models.Pet.id).filter(models.Pet.id == pet_id).first():
+        raise HTTPException(status_code=404, detail="Pet not found")
+
+    similar = similar_pets_index.similar(pet_id, db, limit)
+    pet_cards = load_pet_cards([similar_id for similar_id, _ in similar], db)
+    return [{
+        "pet": pet_cards[similar_id],
+        "score": round(score, 3)
+    } for similar_id, score in similar if similar_id in pet_cards]
 
 @router.get("/{pet_id}/summary")
 async def get_pet_summary(
     pet_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
+    not_modified = check_not_modified(request, response, make_etag("summary", catalog_revision(db), pet_id), PUBLIC_LONG)
+    if not_modified:
+        return not_modified
+
     pet = db.query(models.Pet).filter(models.Pet.id == pet_id).first()
     if not pet:
         raise HTTPException(status_code=404, detail="Pet not found")
@@ -68,6 +247,7 @@ async def get_pet_summary(
 
 @router.post("/", response_model=PetResponse)
 async def create_pet(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     name: str = Form(...),
@@ -129,6 +309,8 @@ async def create_pet(
                 print(f"Warning: Could not upload image for new pet {db_pet.id}: {e}")
             finally:
                 await image.close()
+
+        pet_search.index_pet(db_pet)
         
         try:
             traits = db.query(PetTrainingTrait).filter_by(pet_id=db_pet.id).all()
@@ -136,13 +318,13 @@ async def create_pet(
             pet_response = PetResponse.model_validate(db_pet, from_attributes=True)
             vector = build_pet_vector(pet_response, trait_enums)
             
-            pet_vector = PetVector(pet_id=db_pet.id, vector=vector.tolist())
-            db.add(pet_vector)
-            db.commit()
+            pet_vector_store(db).put(db_pet.id, vector)
             print(f"✅ Auto-created vector for {db_pet.name}")
         except Exception as e:
             print(f"❌ Vector creation failed for {db_pet.name}: {e}")
-        
+
+        bump_catalog_version()
+        background_tasks.add_task(refresh_pet_matches_job, db_pet.id)
         return db_pet
         
     except Exception as e:
@@ -153,6 +335,7 @@ async def create_pet(
 @router.patch("/{pet_id}", response_model=PetResponse)
 async def update_pet(
     pet_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     name: Optional[str] = Form(None),
@@ -207,13 +390,14 @@ async def update_pet(
 
         if summary_needs_update:
             try:
-                pet_dict = {c.name: getattr(pet, c.name) for c in pet.__table__.columns if getattr(pet, c.name) is not None}
+                pet_dict = {c.name: getattr(pet, c.name) for c in pet.__table__.columns if c.name != "search_vector" and getattr(pet, c.name) is not None}
                 pet.summary = await pet_ai_service.generate_pet_summary(pet_dict)
             except Exception as e:
                 print(f"Warning: Failed to update AI summary for pet {pet_id}: {e}")
         
         db.commit()
         db.refresh(pet)
+        pet_search.index_pet(pet)
 
         try:
             traits = db.query(PetTrainingTrait).filter_by(pet_id=pet_id).all()
@@ -221,17 +405,13 @@ async def update_pet(
             pet_response = PetResponse.model_validate(pet, from_attributes=True)
             vector = build_pet_vector(pet_response, trait_enums)
 
-            existing_vector = db.query(PetVector).filter_by(pet_id=pet_id).first()
-            if existing_vector:
-                existing_vector.vector = vector.tolist()
-            else:
-                pet_vector = PetVector(pet_id=pet_id, vector=vector.tolist())
-                db.add(pet_vector)
-            db.commit()
+            pet_vector_store(db).put(pet_id, vector)
             print(f"✅ Auto-updated vector for {pet.name}")
         except Exception as e:
             print(f"❌ Vector update failed for {pet.name}: {e}")
-            
+
+        bump_catalog_version()
+        background_tasks.add_task(refresh_pet_matches_job, pet_id)
         return pet
 
     except Exception as e:
@@ -250,9 +430,13 @@ def delete_pet(pet_id: int, db: Session = Depends(get_db), current_user: User =
     db.query(models.PetTrainingTrait).filter(models.PetTrainingTrait.pet_id == pet_id).delete()
     db.query(models.PetVector).filter(models.PetVector.pet_id == pet_id).delete()
     db.query(models.Match).filter(models.Match.pet_id == pet_id).delete()
+    remove_top_matches_for_pet(pet_id, db)
     
     db.delete(pet)
     db.commit()
+    pet_vector_store(db).record_changes([pet_id], deleted=True)
+    pet_search.remove_pet(pet_id)
+    bump_catalog_version()
     return Response(status_code=204)
 
 @router.get("/{pet_id}/photo")
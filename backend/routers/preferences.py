@@ -1,13 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 from  core.database import get_db
 from  models.user_preferences import UserPreferences
 from  core.dependencies import get_current_user
 from  models.user import User
 from  schemas.preferences_schema import PreferencesSchema
-from  logic.matching_logic import save_adopter_vector
-from  models.user_training_preferences import UserTrainingPreference  
-from  schemas.training_schema import TraitInput
+from  logic.scheduler import refresh_adopter_matches_job
 
 router = APIRouter(prefix="/users/me/preferences", tags=["User Preferences"])
     
@@ -24,6 +22,7 @@ def get_user_preferences(
 @router.post("/", response_model=PreferencesSchema)
 def create_user_preferences(
     preferences: PreferencesSchema,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -34,11 +33,13 @@ def create_user_preferences(
     db.add(new_preferences)
     db.commit()
     db.refresh(new_preferences)
+    background_tasks.add_task(refresh_adopter_matches_job, current_user.id)
     return new_preferences
 
 @router.put("/", response_model=PreferencesSchema)
 def upsert_user_preferences(
     preferences: PreferencesSchema,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -53,9 +54,6 @@ def upsert_user_preferences(
 
     db.commit()
     db.refresh(existing)
-    
-    training_traits_records = db.query(UserTrainingPreference).filter(UserTrainingPreference.user_id == current_user.id).all()
-    training_traits = [TraitInput(trait=t.trait) for t in training_traits_records]
-    save_adopter_vector(current_user.id, existing, training_traits, db)
+    background_tasks.add_task(refresh_adopter_matches_job, current_user.id)
 
     return existing
\ No newline at end of file
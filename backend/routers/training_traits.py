@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, BackgroundTasks
 from sqlalchemy.orm import Session
 from  core.database import get_db
 from  core.dependencies import get_current_user
@@ -6,6 +6,7 @@ from  models.user_training_preferences import UserTrainingPreference, TrainingTr
 from  models.user import User
 from typing import List
 from  schemas.training_schema import TraitInput
+from  logic.scheduler import refresh_adopter_matches_job
 
 router = APIRouter(
     prefix="/preferences/training-traits",
@@ -25,6 +26,7 @@ def get_training_traits(
 @router.post("/", response_model=TrainingTrait)
 def add_training_trait(
     trait_input: TraitInput,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -41,10 +43,12 @@ def add_training_trait(
     )
     db.add(new_trait)
     db.commit()
+    background_tasks.add_task(refresh_adopter_matches_job, current_user.id)
     return new_trait.trait
 
 @router.delete("/{trait}", response_model=dict)
 def delete_training_trait(
+    background_tasks: BackgroundTasks,
     trait: TrainingTrait = Path(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -58,4 +62,5 @@ def delete_training_trait(
 
     db.delete(record)
     db.commit()
+    background_tasks.add_task(refresh_adopter_matches_job, current_user.id)
     return {"message": "Trait removed", "trait": trait}
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, ConfigDict
+from  schemas.training_schema import TraitInput
 from  models.user_preferences import (
     PetSpecies,
     PetEnergyLevel,
@@ -25,4 +26,8 @@ class PreferencesSchema(BaseModel):
     wants_allergy_friendly: bool
     accepts_special_needs: bool
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class MatchPreviewRequest(BaseModel):
+    preferences: PreferencesSchema
+    training_traits: list[TraitInput] = []
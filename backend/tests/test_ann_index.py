@@ -0,0 +1,53 @@
+import numpy as np
+from  benchmarks.synthetic import random_pets, random_adopters
+from  logic.ann_index import LSHIndex
+from  logic.matching_logic import VectorMatrix
+
+
+def _buckets(index):
+    """Every table as a set of ``(bucket key, row)`` pairs."""
+    return [
+        set(zip(np.repeat(bucket_keys, np.diff(bounds)).tolist(), order.tolist()))
+        for bucket_keys, bounds, order in index.tables
+    ]
+
+
+def _edit(matrix, seed):
+    """``matrix`` reordered, with some pets changed, some dropped and a few added."""
+    rng = np.random.default_rng(seed)
+    donors = random_pets(60, seed=seed).vectors
+    vectors = matrix.vectors.copy()
+    changed = rng.choice(len(matrix), 40, replace=False)
+    vectors[changed] = donors[:40]
+    keep = rng.permutation(np.setdiff1d(np.arange(len(matrix)), rng.choice(len(matrix), 30, replace=False)))
+    new_ids = matrix.ids.max() + 1 + np.arange(20)
+    return VectorMatrix(np.concatenate([matrix.ids[keep], new_ids]), np.vstack([vectors[keep], donors[40:]]))
+
+
+def test_incremental_sync_matches_a_full_build():
+    matrix = random_pets(3000, seed=41)
+    index = LSHIndex()
+    assert index.sync(matrix) == len(matrix)
+
+    for seed in range(42, 46):
+        edited = _edit(matrix, seed)
+        incremental = LSHIndex()
+        rehashed = incremental.sync(edited, index)
+        full = LSHIndex()
+        full.sync(edited)
+
+        assert rehashed < 100
+        assert _buckets(incremental) == _buckets(full)
+        for query in random_adopters(10, seed=seed).vectors:
+            assert np.array_equal(incremental.candidate_rows(query, 10), full.candidate_rows(query, 10))
+        matrix, index = edited, incremental
+
+
+def test_sync_against_an_unchanged_matrix_hashes_nothing():
+    matrix = random_pets(500, seed=47)
+    index = LSHIndex()
+    index.sync(matrix)
+
+    again = LSHIndex()
+    assert again.sync(VectorMatrix(matrix.ids, matrix.vectors.copy()), index) == 0
+    assert _buckets(again) == _buckets(index)
@@ -0,0 +1,98 @@
+import numpy as np
+from  benchmarks.synthetic import random_pets, random_adopters
+from  models import User, Pet, PetVector, AdopterVector, Match, UserPreferences
+from  logic.matching_logic import candidate_key, iter_candidate_matches, refresh_matches_for_pet
+from  logic.vector_cache import FLAG_COLUMNS, catalog_from_arrays, load_pet_catalog
+from  logic.vector_store import vector_columns
+
+CANDIDATE_KEYS = [
+    (species, flags)
+    for species in (None, "Dog", "Cat")
+    for flags in ((), (("allergy_friendly", True),), (("special_needs", False),),
+                  (("allergy_friendly", True), ("special_needs", False)))
+]
+
+
+def _catalog(count, seed):
+    pets = random_pets(count, seed=seed)
+    rng = np.random.default_rng(seed)
+    arrays = {
+        "ids": pets.ids,
+        "vectors": pets.vectors,
+        "norms": pets.norms,
+        "species": rng.choice(["Dog", "Cat"], count),
+        "status": rng.choice(["Available", "Available", "Adopted"], count),
+    }
+    for name in FLAG_COLUMNS:
+        arrays[name] = rng.random(count) < 0.3
+    return arrays, catalog_from_arrays(arrays)
+
+
+def test_candidate_key_reads_species_and_hard_constraints():
+    class Preferences:
+        preferred_species = "Cat"
+        wants_allergy_friendly = True
+        accepts_special_needs = False
+
+    assert candidate_key(Preferences()) == ("Cat", (("allergy_friendly", True), ("special_needs", False)))
+    assert candidate_key(None) == (None, ())
+
+
+def test_stored_matches_respect_each_adopters_candidates():
+    arrays, catalog = _catalog(3000, seed=21)
+    adopters = random_adopters(400, seed=22)
+    candidate_keys = {
+        int(user_id): CANDIDATE_KEYS[i % len(CANDIDATE_KEYS)] for i, user_id in enumerate(adopters.ids)
+    }
+    row_of = {pet_id: row for row, pet_id in enumerate(arrays["ids"].tolist())}
+    vector_of = dict(zip(adopters.ids.tolist(), adopters.vectors))
+
+    matched = {}
+    for matches_by_user in iter_candidate_matches(adopters, catalog, candidate_keys, top_k=20, similarity_threshold=0.5, chunk_size=64):
+        matched.update(matches_by_user)
+
+    assert set(matched) == set(adopters.ids.tolist())
+    for user_id, matches in matched.items():
+        species, flags = candidate_keys[user_id]
+        # The pets /match/recommendations ranks for the same answers; batch and
+        # single scoring can order near-ties differently in the last digit.
+        candidates = catalog.adopter_candidates(species, **dict(flags))
+        expected = candidates.top_k(vector_of[user_id], 20, 0.5)
+        assert np.allclose([score for _, score in matches], [score for _, score in expected], rtol=0, atol=1e-11)
+        assert np.isin([pet_id for pet_id, _ in matches], candidates.ids).all()
+        for pet_id, _ in matches:
+            row = row_of[pet_id]
+            assert arrays["status"][row] == "Available"
+            assert species is None or arrays["species"][row] == species
+            assert all(arrays[name][row] == wanted for name, wanted in flags)
+
+
+def test_adopter_candidates_fall_back_to_every_species():
+    arrays, catalog = _catalog(500, seed=23)
+    no_cats = arrays["species"] != "Cat"
+    arrays["special_needs"] = np.where(no_cats, arrays["special_needs"], True)
+    catalog = catalog_from_arrays(arrays)
+
+    assert len(catalog.candidates("Cat", special_needs=False)) == 0
+    fallback = catalog.adopter_candidates("Cat", special_needs=False)
+    assert np.array_equal(fallback.ids, catalog.candidates(special_needs=False).ids)
+
+
+def test_pet_refresh_skips_adopters_it_is_not_a_candidate_for(db):
+    for user_id, wants_allergy_friendly in ((1, True), (2, False)):
+        db.add(User(id=user_id, email=f"adopter{user_id}@example.com", password_hash="x"))
+        db.add(UserPreferences(
+            user_id=user_id, preferred_species="Dog", wants_allergy_friendly=wants_allergy_friendly,
+            accepts_special_needs=True
+        ))
+    db.add(Pet(id=1, name="Rex", species="Dog", age_group="Adult", sex="Male", status="Available", allergy_friendly=False))
+    db.flush()
+    vector = np.ones(13)
+    db.add(PetVector(pet_id=1, **vector_columns(vector)))
+    for user_id in (1, 2):
+        db.add(AdopterVector(user_id=user_id, **vector_columns(vector)))
+    db.commit()
+
+    refresh_matches_for_pet(1, db, load_pet_catalog(db))
+
+    assert [user_id for (user_id,) in db.query(Match.user_id).filter(Match.pet_id == 1)] == [2]
@@ -0,0 +1,37 @@
+import time
+from  logic.catalog_cache import CatalogCache
+
+
+def _unreachable_cache(ttl_seconds):
+    # Nothing listens on port 1, so every read takes the in-process fallback.
+    return CatalogCache("redis://127.0.0.1:1", ttl_seconds=ttl_seconds)
+
+
+def test_local_fallback_entries_expire():
+    cache = _unreachable_cache(ttl_seconds=0.2)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return len(loads)
+
+    assert cache.get_or_load("pets", {"page": 1}, loader) == 1
+    assert cache.get_or_load("pets", {"page": 1}, loader) == 1
+    time.sleep(0.25)
+    assert cache.get_or_load("pets", {"page": 1}, loader) == 2
+
+
+def test_local_fallback_cards_expire():
+    cache = _unreachable_cache(ttl_seconds=0.2)
+    loaded = []
+
+    def loader(ids):
+        loaded.extend(ids)
+        return {pet_id: {"id": pet_id} for pet_id in ids}
+
+    assert cache.get_many("pet_card", [1, 2], loader) == {1: {"id": 1}, 2: {"id": 2}}
+    cache.get_many("pet_card", [1, 2], loader)
+    assert loaded == [1, 2]
+    time.sleep(0.25)
+    cache.get_many("pet_card", [2], loader)
+    assert loaded == [1, 2, 2]
@@ -0,0 +1,45 @@
+import numpy as np
+from  benchmarks.synthetic import random_pets
+from  logic.vector_cache import FLAG_COLUMNS, _catalog_order, catalog_from_arrays
+
+HARD_CONSTRAINT_FLAGS = [{}, {"allergy_friendly": True}, {"special_needs": False}, {"allergy_friendly": True, "special_needs": False}]
+
+
+def _sorted_arrays(count, seed):
+    pets = random_pets(count, seed=seed)
+    rng = np.random.default_rng(seed)
+    arrays = {
+        "ids": pets.ids,
+        "vectors": pets.vectors,
+        "norms": pets.norms,
+        "species": rng.choice(["Dog", "Cat"], count),
+        "status": rng.choice(["Available", "Pending", "Adopted"], count),
+    }
+    for name in FLAG_COLUMNS:
+        arrays[name] = rng.random(count) < 0.5
+    order = _catalog_order(arrays)
+    return {name: array[order] for name, array in arrays.items()}
+
+
+def test_hard_constraint_candidates_are_views_of_the_catalog():
+    arrays = _sorted_arrays(2000, seed=31)
+    catalog = catalog_from_arrays(arrays)
+    for species in ("Dog", "Cat"):
+        for flags in HARD_CONSTRAINT_FLAGS:
+            candidates = catalog.candidates(species, **flags)
+            assert len(candidates) > 0
+            assert np.shares_memory(candidates.vectors, catalog.matrix.vectors), (species, flags)
+    assert np.shares_memory(catalog.candidates().vectors, catalog.matrix.vectors)
+
+
+def test_candidates_hold_exactly_the_matching_pets():
+    arrays = _sorted_arrays(2000, seed=32)
+    catalog = catalog_from_arrays(arrays)
+    for species in (None, "Dog", "Cat"):
+        for flags in HARD_CONSTRAINT_FLAGS + [{"kid_friendly": True, "pet_friendly": False}]:
+            mask = arrays["status"] == "Available"
+            if species:
+                mask &= arrays["species"] == species
+            for name, wanted in flags.items():
+                mask &= arrays[name] == wanted
+            assert sorted(catalog.candidates(species, **flags).ids.tolist()) == sorted(arrays["ids"][mask].tolist())
@@ -0,0 +1,62 @@
+import numpy as np
+from  benchmarks.synthetic import random_pet_rows, random_preference_rows
+from  models.user_training_preferences import TrainingTrait
+from  schemas.pet_schema import PetResponse
+from  schemas.preferences_schema import PreferencesSchema
+from  schemas.training_schema import TraitInput
+from  logic.matching_logic import (
+    build_pet_vector,
+    build_adopter_vector,
+    build_pet_matrix,
+    build_adopter_matrix,
+    VECTOR_DIM
+)
+
+
+def _same_bits(actual, expected):
+    actual, expected = np.asarray(actual), np.asarray(expected, dtype=np.float64)
+    return actual.dtype == expected.dtype and actual.shape == expected.shape and actual.tobytes() == expected.tobytes()
+
+
+def test_pet_vector_matches_pandas_encoding():
+    # Expected values follow the pandas encoder: ordinals are category code
+    # over (levels - 1), and a missing value is code -1.
+    pet = PetResponse(
+        id=1, name="Rex", age_group="Senior", sex="Female", species="Cat", size="Large",
+        hair_length="Long", allergy_friendly=True, kid_friendly=False, pet_friendly=True
+    )
+    expected = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0, 2 / 3, -1 / 3, 4 / 4, 0 / 2, 2 / 2, 0.0, 1.0]
+    assert _same_bits(build_pet_vector(pet, [TrainingTrait.LitterTrained]), expected)
+
+
+def test_adopter_vector_matches_pandas_encoding():
+    preferences = PreferencesSchema(
+        preferred_species="NoPreference", pet_purpose="Myself", has_children=True, has_dogs=False,
+        has_cats=False, ownership_experience="HadBefore", preferred_age="Young", preferred_sex="Male",
+        preferred_size="Medium", preferred_energy_level="Calm", preferred_hair_length="NoPreference",
+        wants_allergy_friendly=False, accepts_special_needs=True
+    )
+    traits = [TraitInput(trait=TrainingTrait.HouseTrained)]
+    expected = [0.0, 1.0, 1.0, 0.0, 1 / 2, 1.0, 0.5, 1 / 3, 1 / 3, 2 / 4, 0.5, 1.0, 0.0]
+    assert _same_bits(build_adopter_vector(preferences, traits), expected)
+
+
+def test_pet_matrix_rows_match_single_vectors():
+    pets, traits_by_pet = random_pet_rows(300, seed=3)
+    matrix = build_pet_matrix(pets, traits_by_pet)
+    assert _same_bits(matrix, [build_pet_vector(pet, traits_by_pet[pet.id]) for pet in pets])
+
+
+def test_adopter_matrix_rows_match_single_vectors():
+    rows, traits_by_user = random_preference_rows(300, seed=4)
+    matrix = build_adopter_matrix(rows, traits_by_user)
+    expected = [
+        build_adopter_vector(row, [TraitInput(trait=trait) for trait in traits_by_user[row.user_id]])
+        for row in rows
+    ]
+    assert _same_bits(matrix, expected)
+
+
+def test_empty_matrices_keep_their_width():
+    assert build_pet_matrix([], {}).shape == (0, VECTOR_DIM)
+    assert build_adopter_matrix([], {}).shape == (0, VECTOR_DIM)
@@ -0,0 +1,36 @@
+"""Stored match depth; runs against Postgres when ``TEST_DATABASE_URL`` is set."""
+import numpy as np
+from  models import User, Pet, PetVector, AdopterVector, Match, AdopterTopMatch
+from  logic.matching_logic import MATCHES_PER_ADOPTER, refresh_matches_for_pet
+from  logic.vector_store import vector_columns
+from  logic.vector_cache import load_pet_catalog
+
+
+def _unit(angle):
+    return np.array([np.cos(angle), np.sin(angle)] + [0.0] * 11)
+
+
+def test_full_adopter_keeps_their_depth_after_a_pet_refresh(db):
+    db.add(User(id=1, email="adopter@example.com", password_hash="x"))
+    for pet_id in range(1, MATCHES_PER_ADOPTER + 2):
+        db.add(Pet(id=pet_id, name=f"Pet {pet_id}", species="Dog", age_group="Adult", sex="Male", status="Available"))
+    db.flush()
+    db.add(AdopterVector(user_id=1, **vector_columns(_unit(0.0))))
+
+    # A full list of decent matches, then a pet edited into a near-perfect one.
+    for pet_id in range(1, MATCHES_PER_ADOPTER + 1):
+        angle = 0.5 + pet_id / 1000
+        db.add(PetVector(pet_id=pet_id, **vector_columns(_unit(angle))))
+        db.add(Match(user_id=1, pet_id=pet_id, match_score=float(np.cos(angle))))
+    new_pet_id = MATCHES_PER_ADOPTER + 1
+    db.add(PetVector(pet_id=new_pet_id, **vector_columns(_unit(0.01))))
+    db.commit()
+
+    refresh_matches_for_pet(new_pet_id, db, load_pet_catalog(db))
+
+    pet_ids = [pet_id for (pet_id,) in db.query(Match.pet_id).filter(Match.user_id == 1)]
+    assert len(pet_ids) == MATCHES_PER_ADOPTER
+    assert new_pet_id in pet_ids
+    # The weakest match made room for the new one.
+    assert MATCHES_PER_ADOPTER not in pet_ids
+    assert db.query(AdopterTopMatch).filter(AdopterTopMatch.user_id == 1).count() == MATCHES_PER_ADOPTER
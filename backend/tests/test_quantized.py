@@ -0,0 +1,28 @@
+import numpy as np
+from  benchmarks.synthetic import random_pets, random_adopters
+from  logic.quantized import QuantizedMatrix
+
+
+def test_lookup_tables_rank_like_float_scoring():
+    pets = random_pets(2000, seed=11)
+    quantized = QuantizedMatrix.from_matrix(pets)
+    for query in random_adopters(50, seed=12).vectors:
+        assert quantized.top_k(query, 20, 0.6) == pets.top_k(query, 20, 0.6)
+
+        # A score landing exactly halfway at the 12th digit can round either
+        # way, so the full orders agree up to that rounding.
+        float_scores = pets.scores(query)  # synthetic pet ids are rows + 1
+        lut_order = [pet_id for pet_id, _ in quantized.top_k(query, len(pets), -1.0)]
+        float_order = [pet_id for pet_id, _ in pets.top_k(query, len(pets), -1.0)]
+        assert np.allclose(float_scores[np.array(lut_order) - 1], float_scores[np.array(float_order) - 1], rtol=0, atol=1e-12)
+        assert np.allclose(quantized.scores(query), float_scores, rtol=0, atol=1e-12)
+
+
+def test_decoded_vectors_round_trip():
+    pets = random_pets(500, seed=13)
+    quantized = QuantizedMatrix.from_matrix(pets)
+    assert np.array_equal(quantized.vectors, pets.vectors)
+
+    rows = slice(10, 60)
+    query = pets.vectors[0]
+    assert quantized.subset(rows).top_k(query, 5, 0.0) == pets.subset(rows).top_k(query, 5, 0.0)
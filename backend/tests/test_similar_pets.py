@@ -0,0 +1,47 @@
+import numpy as np
+from  benchmarks.synthetic import random_pets
+from  logic.matching_logic import VectorMatrix
+from  logic.similar_pets import SimilarPetsIndex
+
+
+def _rebuilt(matrix):
+    index = SimilarPetsIndex(k=5)
+    index.rebuild(matrix)
+    return index.neighbours
+
+
+def _edit(matrix, changed, removed, added):
+    """``matrix`` with rows swapped for other pets' vectors, some dropped and some appended."""
+    donors = random_pets(len(changed) + len(added), seed=99).vectors
+    vectors = matrix.vectors.copy()
+    vectors[changed] = donors[:len(changed)]
+    keep = np.setdiff1d(np.arange(len(matrix)), removed)
+    new_ids = matrix.ids.max() + 1 + np.arange(len(added))
+    return VectorMatrix(
+        np.concatenate([matrix.ids[keep], new_ids]),
+        np.vstack([vectors[keep], donors[len(changed):]])
+    )
+
+
+def test_incremental_sync_matches_rebuild():
+    matrix = random_pets(400, seed=7)
+    index = SimilarPetsIndex(k=5)
+    index.sync(matrix)
+
+    rng = np.random.default_rng(8)
+    for _ in range(5):
+        rows = rng.permutation(len(matrix))
+        matrix = _edit(matrix, changed=rows[:6], removed=rows[6:10], added=range(3))
+        rescored = index.sync(matrix)
+        assert rescored < len(matrix)
+        assert index.neighbours == _rebuilt(matrix)
+
+
+def test_sync_without_changes_rescores_nothing():
+    matrix = random_pets(100, seed=9)
+    index = SimilarPetsIndex(k=5)
+    index.sync(matrix)
+    before = dict(index.neighbours)
+
+    assert index.sync(VectorMatrix(matrix.ids, matrix.vectors.copy())) == 0
+    assert index.neighbours == before
@@ -0,0 +1,24 @@
+import numpy as np
+from  logic.matching_logic import top_k_indices
+
+
+def _sorted_top_k(scores, top_k, similarity_threshold):
+    order = np.argsort(-scores, kind="stable")
+    return order[scores[order] >= similarity_threshold][:top_k]
+
+
+def test_top_k_indices_matches_stable_sort():
+    rng = np.random.default_rng(5)
+    for _ in range(200):
+        # Few distinct values, so most cut-offs fall inside a run of ties.
+        scores = rng.integers(0, 6, size=rng.integers(0, 60)) / 5
+        top_k = int(rng.integers(0, 20))
+        threshold = float(rng.choice([-1.0, 0.4, 0.6]))
+        assert top_k_indices(scores, top_k, threshold).tolist() == _sorted_top_k(scores, top_k, threshold).tolist()
+
+
+def test_top_k_indices_keeps_earliest_rows_of_a_tie():
+    scores = np.array([0.7, 0.9, 0.7, 0.7, 0.9, 0.5])
+    assert top_k_indices(scores, 4, 0.6).tolist() == [1, 4, 0, 2]
+    assert top_k_indices(scores, 10, 0.6).tolist() == [1, 4, 0, 2, 3]
+    assert top_k_indices(scores, 0, 0.6).tolist() == []
@@ -0,0 +1,75 @@
+import numpy as np
+from  logic.vector_store import ChangeFeed, InMemoryVectorStore, MmapVectorStore
+
+
+def _vectors(keys, dim=4, seed=0):
+    rng = np.random.default_rng(seed)
+    return {key: rng.random(dim) for key in keys}
+
+
+def test_in_memory_store_round_trips_and_logs_changes():
+    store = InMemoryVectorStore()
+    vectors = _vectors([3, 1, 2])
+    start = store.version
+    store.put_many(vectors)
+    store.delete_many([2])
+
+    ids, matrix = store.all()
+    assert ids.tolist() == [1, 3]
+    assert np.array_equal(matrix, np.stack([vectors[1], vectors[3]]))
+    assert store.get(2) is None
+    assert store.changes_since(start) == (store.version, {1, 3}, {2})
+
+
+def test_mmap_store_grows_when_full(tmp_path):
+    store = MmapVectorStore(str(tmp_path), dim=4, capacity=2)
+    vectors = _vectors(range(5))
+    store.put_many(vectors)
+
+    assert len(store._keys) == 8
+    ids, matrix = store.all()
+    assert ids.tolist() == [0, 1, 2, 3, 4]
+    assert np.array_equal(matrix, np.stack([vectors[key] for key in range(5)]))
+
+
+def test_mmap_store_reuses_deleted_rows(tmp_path):
+    store = MmapVectorStore(str(tmp_path), dim=4, capacity=4)
+    store.put_many(_vectors(range(4)))
+    row = store._row_of[1]
+    store.delete_many([1])
+    replacement = _vectors([10], seed=1)
+    store.put_many(replacement)
+
+    assert len(store._keys) == 4
+    assert store._row_of[10] == row
+    assert store.get(1) is None
+    assert np.array_equal(store.get(10), replacement[10])
+
+
+def test_mmap_store_reopens_from_disk(tmp_path):
+    store = MmapVectorStore(str(tmp_path), dim=4, capacity=2)
+    vectors = _vectors(range(3))
+    store.put_many(vectors)
+    store.delete_many([0])
+    store.put(1, vectors[2])
+
+    reopened = MmapVectorStore(str(tmp_path), dim=4)
+    assert reopened.all()[0].tolist() == [1, 2]
+    assert np.array_equal(reopened.get(1), vectors[2])
+    assert np.array_equal(reopened.get(2), vectors[2])
+    # The deleted key's row is free again after reopening.
+    reopened.put(7, vectors[0])
+    assert reopened._row_of[7] == 0
+    assert len(reopened._keys) == 4
+
+
+def test_change_feed_reports_when_it_no_longer_reaches_back():
+    feed = ChangeFeed(size=3)
+    for key in range(5):
+        feed.record([key])
+
+    assert feed.since(1) is None
+    assert feed.since(2) == (5, {3, 4, 2}, set())
+    assert feed.since(5) == (5, set(), set())
+    feed.record([3], deleted=True)
+    assert feed.since(4) == (6, {4}, {3})